@@ -682,6 +682,19 @@ pub struct MemoryConfig {
     pub recall_limit: usize,
     /// Minimum similarity score for auto-recall (0.0–1.0)
     pub recall_threshold: f64,
+    /// Max embedding vectors kept in the in-process LRU cache (0 = disabled)
+    #[serde(default = "default_embedding_cache_capacity")]
+    pub embedding_cache_capacity: usize,
+    /// Reuse a recent embedding whose cosine similarity to a caller-supplied
+    /// probe exceeds this value (None = semantic cache disabled)
+    #[serde(default)]
+    pub semantic_cache_threshold: Option<f64>,
+    /// Max embedding batch requests in flight at once
+    #[serde(default = "default_embedding_max_concurrency")]
+    pub embedding_max_concurrency: usize,
+    /// Max rows in the on-disk embedding cache shared across restarts (0 = disabled)
+    #[serde(default = "default_embedding_disk_cache_capacity")]
+    pub embedding_disk_cache_capacity: usize,
 }
 
 #[derive(Debug, Clone, Serialize, Deserialize)]
@@ -725,6 +738,15 @@ pub(crate) fn default_max_concurrent_runs() -> u32 {
 pub(crate) fn default_context_window_tokens() -> usize {
     32_000
 }
+pub(crate) fn default_embedding_cache_capacity() -> usize {
+    10_000
+}
+pub(crate) fn default_embedding_max_concurrency() -> usize {
+    4
+}
+pub(crate) fn default_embedding_disk_cache_capacity() -> usize {
+    20_000
+}
 
 #[derive(Debug, Clone, Serialize, Deserialize)]
 pub struct EngineConfig {
@@ -1461,7 +1461,8 @@ use crate::engine::sessions::SessionStore;
 /// This implements the GDPR right-to-erasure ("right to be forgotten").
 ///
 /// Erases: episodic, semantic, procedural memories; working memory snapshots;
-/// memory edges; and audit log entries for the given identifiers.
+/// memory edges; and audit log entries for the given identifiers.  The
+/// embedding cache is cleared as well.
 pub fn engram_purge_user(
     store: &SessionStore,
     user_identifiers: &UserPurgeRequest,
@@ -1522,6 +1523,10 @@ pub fn engram_purge_user(
         )?;
         total_erased += deleted as u64;
     }
+    drop(conn);
+
+    // Cached vectors of the purged text (in memory and in embedding_cache.db).
+    crate::engine::memory::clear_embedding_cache();
 
     info!(
         "[engram-gdpr] Purged {} records for user identifiers: {:?}",
@@ -14,6 +14,7 @@
 
 use log::{info, warn};
 use parking_lot::Mutex;
+use rand::RngExt;
 use sha2::{Digest, Sha256};
 use std::sync::atomic::{AtomicU32, AtomicU64, Ordering};
 use std::sync::Arc;
@@ -78,18 +79,22 @@ fn apply_jitter(base_ms: u64) -> u64 {
     if jitter_range == 0 {
         return base_ms.max(100);
     }
-    let offset = (rand_jitter() % (2 * jitter_range + 1)) - jitter_range;
+    let offset = rand::rng().random_range(-jitter_range..=jitter_range);
     let result = base_ms as i64 + offset;
     result.max(100) as u64
 }
 
-/// Simple jitter source using system clock nanos (no extra crate needed).
-fn rand_jitter() -> i64 {
-    let nanos = SystemTime::now()
-        .duration_since(SystemTime::UNIX_EPOCH)
-        .unwrap_or_default()
-        .subsec_nanos();
-    (nanos % 1000) as i64
+/// Full-jitter backoff (AWS style): a uniformly random delay in
+/// `[0, min(30s, 1s × 2^attempt)]`, so callers that failed together spread
+/// their retries out instead of hitting a recovering server in lockstep.
+/// A server-sent Retry-After is used as-is (capped at 60s).
+/// `attempt` is 0-based.  Returns the delay without sleeping.
+pub fn full_jitter_backoff(attempt: u32, retry_after_secs: Option<u64>) -> Duration {
+    if let Some(secs) = retry_after_secs {
+        return Duration::from_secs(secs.min(60));
+    }
+    let ceiling_ms = (INITIAL_RETRY_DELAY_MS << attempt.min(16)).min(MAX_RETRY_DELAY_MS);
+    Duration::from_millis(rand::rng().random_range(0..=ceiling_ms))
 }
 
 // ── Retry-After header parsing ─────────────────────────────────────────────
@@ -426,6 +431,18 @@ mod tests {
         }
     }
 
+    #[test]
+    fn full_jitter_backoff_bounds() {
+        for attempt in 0..8 {
+            let ceiling = Duration::from_millis((1_000u64 << attempt).min(30_000));
+            for _ in 0..50 {
+                assert!(full_jitter_backoff(attempt, None) <= ceiling);
+            }
+        }
+        assert_eq!(full_jitter_backoff(0, Some(7)), Duration::from_secs(7));
+        assert_eq!(full_jitter_backoff(5, Some(600)), Duration::from_secs(60));
+    }
+
     #[test]
     fn circuit_breaker_trips_and_recovers() {
         let cb = CircuitBreaker::new(3, 1); // trip after 3 failures, 1s cooldown
@@ -8,12 +8,26 @@
 //   Ollama → OpenAI-at-same-URL → user's chat provider fallback
 // so existing setups keep working without configuration changes.
 
-use crate::atoms::error::EngineResult;
+use super::embedding_cache;
+use super::embedding_disk_cache;
+use crate::atoms::engram_types::TokenizerType;
+use crate::atoms::error::{EngineError, EngineResult};
+use crate::engine::engram::tokenizer::Tokenizer;
+use crate::engine::http::{full_jitter_backoff, is_retryable_status, parse_retry_after};
 use crate::engine::types::*;
+use futures::stream::{self, StreamExt};
 use log::{info, warn};
+use parking_lot::Mutex;
+use rand::RngExt;
+use reqwest::header::{HeaderMap, HeaderValue, AUTHORIZATION, RETRY_AFTER};
 use reqwest::Client;
+use serde::de::DeserializeOwned;
+use serde::Deserialize;
 use serde_json::{json, Value};
+use std::collections::HashMap;
 use std::sync::atomic::{AtomicBool, Ordering};
+use std::sync::{Arc, LazyLock};
+use std::time::{Duration, Instant};
 
 /// Track whether we've already tried to pull the model this session.
 static MODEL_PULL_ATTEMPTED: AtomicBool = AtomicBool::new(false);
@@ -23,6 +37,57 @@ static MODEL_PULL_ATTEMPTED: AtomicBool = AtomicBool::new(false);
 /// rest of this process to avoid spamming 400s.
 static PROVIDER_EMBED_UNSUPPORTED: AtomicBool = AtomicBool::new(false);
 
+/// How long a `check_ollama_running` result is reused before re-probing.
+const OLLAMA_STATUS_TTL: Duration = Duration::from_secs(30);
+
+/// Last reachability result per Ollama base URL.  Status panels poll
+/// `check_ollama_running`, and each probe is a full `/api/tags` round-trip
+/// (up to the 5s timeout when Ollama is down).
+static OLLAMA_STATUS: LazyLock<Mutex<HashMap<String, (Instant, bool)>>> =
+    LazyLock::new(|| Mutex::new(HashMap::new()));
+
+/// Remember a fresh Ollama reachability probe for `check_ollama_running`.
+pub(crate) fn record_ollama_status(base_url: &str, running: bool) {
+    OLLAMA_STATUS
+        .lock()
+        .insert(base_url.to_string(), (Instant::now(), running));
+}
+
+/// A singleton `reqwest::Client` shared by every `EmbeddingClient` and the
+/// Ollama setup helpers.  `EngineState::embedding_client()` caches its
+/// client, but config changes rebuild it and `ensure_ollama_ready` builds
+/// its own; sharing one pool means none of them pays a fresh TCP + TLS
+/// handshake, and connections stay alive across rebuilds.
+///
+/// HTTPS providers that offer HTTP/2 via ALPN get it automatically, so
+/// concurrent `embed_batch` requests multiplex over a single connection
+/// instead of opening one socket each.  Plain-HTTP Ollama stays on HTTP/1.1.
+static EMBED_HTTP_CLIENT: LazyLock<Client> = LazyLock::new(|| {
+    Client::builder()
+        .pool_max_idle_per_host(32)
+        .pool_idle_timeout(Duration::from_secs(90))
+        .tcp_keepalive(Duration::from_secs(60))
+        .connect_timeout(Duration::from_secs(10))
+        .http2_adaptive_window(true)
+        .build()
+        .expect("Failed to build embedding reqwest::Client")
+});
+
+/// Get the shared keep-alive HTTP client used for embedding and Ollama calls.
+pub(crate) fn embedding_http_client() -> Client {
+    EMBED_HTTP_CLIENT.clone()
+}
+
+/// Max texts sent in one embedding request by `embed_batch`.
+pub const EMBED_BATCH_SIZE: usize = 256;
+
+/// Max estimated input tokens per `embed_batch` request.  OpenAI rejects
+/// requests over 300k total tokens; leave headroom for estimate error.
+pub const EMBED_BATCH_MAX_TOKENS: usize = 250_000;
+
+/// Upper bound of the random delay staggering concurrent batch requests.
+const BATCH_JITTER_MAX_MS: u64 = 50;
+
 /// Optional fallback to an OpenAI-compatible provider when Ollama is not running.
 #[derive(Clone, Debug)]
 pub struct OpenAiFallback {
@@ -35,6 +100,8 @@ pub struct OpenAiFallback {
 }
 
 /// Embedding client — calls Ollama, OpenAI, Google, or any compatible API.
+/// Cheap to clone: the HTTP client is a shared handle to one pool.
+#[derive(Clone)]
 pub struct EmbeddingClient {
     client: Client,
     /// Which backend to use (auto, ollama, openai, google, provider).
@@ -43,25 +110,99 @@ pub struct EmbeddingClient {
     model: String,
     /// If set, used as a fallback when the primary is unreachable.
     openai_fallback: Option<OpenAiFallback>,
+    /// Request URLs derived from `base_url`, formatted once at construction.
+    ollama_embed_url: String,
+    ollama_legacy_url: String,
+    openai_embed_url: String,
+    /// Fallback provider endpoints (Azure gets `api-version` appended).
+    fallback_embed_url: String,
+    fallback_chat_url: String,
+    /// Fallback auth: `api-key` for Azure, `Authorization: Bearer` otherwise.
+    fallback_headers: HeaderMap,
+    /// The fallback chat model only accepts the default temperature.
+    fallback_chat_fixed_temperature: bool,
+    /// Max entries in the process-wide embedding LRU (0 = disabled).
+    cache_capacity: usize,
+    /// Max rows in the persistent on-disk cache (0 = disabled).
+    disk_cache_capacity: usize,
+    /// Vector space of the configured model at `base_url` (Ollama, or
+    /// OpenAI-format at the same URL).
+    base_space: VectorSpace,
+    /// Vector space of the fallback provider's embedding model.
+    fallback_space: VectorSpace,
+    /// Vector space of the Gemini `embedContent` model on the fallback.
+    google_space: VectorSpace,
+    /// Cosine similarity above which `embed_near` reuses a cached vector.
+    semantic_threshold: Option<f64>,
+    /// Max batch requests `embed_batch` keeps in flight.
+    max_concurrency: usize,
+    /// Input limit (tokens) for every model this client may route to.
+    token_budget: usize,
+    /// Token estimator matched to the primary model's family.
+    tokenizer: Tokenizer,
 }
 
 impl EmbeddingClient {
     pub fn new(config: &MemoryConfig) -> Self {
+        let base_url = config.embedding_base_url.trim_end_matches('/').to_string();
         EmbeddingClient {
-            client: Client::new(),
+            client: embedding_http_client(),
             provider: config.embedding_provider.clone(),
-            base_url: config.embedding_base_url.clone(),
+            ollama_embed_url: format!("{}/api/embed", base_url),
+            ollama_legacy_url: format!("{}/api/embeddings", base_url),
+            openai_embed_url: format!("{}/v1/embeddings", base_url),
             model: config.embedding_model.clone(),
             openai_fallback: None,
+            fallback_embed_url: String::new(),
+            fallback_chat_url: String::new(),
+            fallback_headers: HeaderMap::new(),
+            fallback_chat_fixed_temperature: false,
+            cache_capacity: config.embedding_cache_capacity,
+            disk_cache_capacity: config.embedding_disk_cache_capacity,
+            base_space: VectorSpace::new(&base_url, &config.embedding_model),
+            fallback_space: VectorSpace::default(),
+            google_space: VectorSpace::default(),
+            base_url,
+            semantic_threshold: config.semantic_cache_threshold,
+            max_concurrency: config.embedding_max_concurrency.max(1),
+            token_budget: embedding_token_budget(&config.embedding_model),
+            tokenizer: Tokenizer::new(embedding_tokenizer_type(&config.embedding_model)),
         }
     }
 
     /// Set an OpenAI-compatible provider as fallback when Ollama is unreachable.
-    pub fn with_openai_fallback(mut self, fallback: OpenAiFallback) -> Self {
+    pub fn with_openai_fallback(mut self, mut fallback: OpenAiFallback) -> Self {
+        // Normalise once here instead of on every request.
+        fallback.base_url = fallback.base_url.trim_end_matches('/').to_string();
+        let is_azure = fallback.base_url.contains(".azure.com");
+        self.fallback_embed_url = fallback_url(&fallback.base_url, is_azure, "embeddings");
+        self.fallback_chat_url = fallback_url(&fallback.base_url, is_azure, "chat/completions");
+        self.fallback_headers = fallback_headers(&fallback.api_key, is_azure);
+        self.fallback_chat_fixed_temperature = chat_model_fixed_temperature(&fallback.chat_model);
+        // Inputs are truncated before routing, so fit the smaller model.
+        self.token_budget = self
+            .token_budget
+            .min(embedding_token_budget(&fallback.embedding_model));
+        self.fallback_space = VectorSpace::new(&fallback.base_url, &fallback.embedding_model);
+        self.google_space = VectorSpace::new(&fallback.base_url, google_embedding_model(&fallback));
         self.openai_fallback = Some(fallback);
         self
     }
 
+    /// The space of the backend the configured route tries first.  Cache
+    /// lookups only consult this space: a vector another backend produced
+    /// during an outage is cached under its own space and never served here.
+    fn primary_space(&self) -> &VectorSpace {
+        if self.openai_fallback.is_none() {
+            return &self.base_space;
+        }
+        match self.provider {
+            EmbeddingProvider::OpenAI | EmbeddingProvider::Provider => &self.fallback_space,
+            EmbeddingProvider::Google => &self.google_space,
+            EmbeddingProvider::Auto | EmbeddingProvider::Ollama => &self.base_space,
+        }
+    }
+
     /// The model name used for embeddings.
     pub fn model_name(&self) -> &str {
         &self.model
@@ -79,62 +220,226 @@ impl EmbeddingClient {
     /// Every path still ends with the keyword-search safety net in the
     /// memory layer, so we never lose memories.
     pub async fn embed(&self, text: &str) -> EngineResult<Vec<f32>> {
-        // Safety truncation: nomic-embed-text context is 8192 tokens (~6K chars).
-        // Truncate rather than fail for oversized inputs.
-        // Use floor_char_boundary to avoid panicking on multi-byte chars (e.g. em dash —)
-        let safe_text: &str = &text[..text.floor_char_boundary(6000)];
+        self.embed_near(text, None).await
+    }
 
-        match self.provider {
-            EmbeddingProvider::Ollama => self.embed_route_ollama(safe_text).await,
-            EmbeddingProvider::OpenAI => self.embed_route_openai(safe_text).await,
-            EmbeddingProvider::Google => self.embed_route_google(safe_text).await,
-            EmbeddingProvider::Provider => self.embed_route_provider(safe_text).await,
-            EmbeddingProvider::Auto => self.embed_route_auto(safe_text).await,
+    /// Like [`embed`](Self::embed), but when the exact-match cache misses and
+    /// the caller supplies `probe` (an embedding it already holds for a
+    /// related text), reuse the most similar recent vector if its cosine
+    /// similarity exceeds `semantic_cache_threshold`.  Without a threshold
+    /// configured this is identical to `embed`.  Vectors are collected for
+    /// reuse only once a probe has been made in this vector space.
+    pub async fn embed_near(&self, text: &str, probe: Option<&[f32]>) -> EngineResult<Vec<f32>> {
+        // Blank input has no meaningful embedding; don't spend a round-trip.
+        // `trim` borrows, so this never copies the text.
+        if text.trim().is_empty() {
+            return Err("Cannot embed blank text".into());
+        }
+        let safe_text = truncate_for_embedding(&self.tokenizer, text, self.token_budget);
+        let hash = embedding_cache::text_hash(safe_text);
+        let primary = self.primary_space();
+
+        // Exact-match cache: identical text in the same vector space
+        // never needs a second round-trip.
+        if self.cache_capacity > 0 {
+            if let Some(vec) = embedding_cache::lookup(&(primary.id, hash)) {
+                return Ok(vec);
+            }
+        }
+        if self.disk_cache_capacity > 0 {
+            if let Some(vec) = embedding_disk_cache::lookup_many(&primary.name, &[hash])
+                .pop()
+                .flatten()
+            {
+                self.remember(primary, hash, &vec);
+                return Ok(vec);
+            }
+        }
+        if let (Some(threshold), Some(probe)) = (self.semantic_threshold, probe) {
+            if let Some(vec) = embedding_cache::lookup_similar(primary.id, probe, threshold) {
+                return Ok(vec);
+            }
         }
+
+        let (mut vecs, space) = self.embed_uncached(&[safe_text]).await?;
+        let vec = vecs
+            .pop()
+            .ok_or_else(|| "Embedding backend returned no vectors".to_string())?;
+        self.remember(space, hash, &vec);
+        self.persist(space, &[(hash, &vec)]);
+        Ok(vec)
     }
 
-    // ── Route: Auto (legacy cascade) ─────────────────────────────────────
-    async fn embed_route_auto(&self, text: &str) -> EngineResult<Vec<f32>> {
-        // Try Ollama format first (new /api/embed endpoint, then legacy /api/embeddings)
-        let ollama_result = self.embed_ollama(text).await;
-        if let Ok(vec) = ollama_result {
-            return Ok(vec);
+    /// Embed many texts with as few HTTP round-trips as possible.
+    ///
+    /// Blank texts get `None` without touching the network, and duplicates
+    /// are embedded once and fanned back out to every position.  Cached
+    /// texts are answered locally.  The rest are sorted longest-first (so
+    /// each request holds similarly sized inputs) and packed greedily into
+    /// requests of at most `EMBED_BATCH_SIZE` texts and
+    /// `EMBED_BATCH_MAX_TOKENS` estimated tokens, using the array form of
+    /// `input`, with up to
+    /// `embedding_max_concurrency` requests in flight.  The result is
+    /// aligned with `texts`; entries whose chunk failed are `None`.  Returns
+    /// `Err` only when every chunk failed.
+    pub async fn embed_batch(&self, texts: &[&str]) -> EngineResult<Vec<Option<Vec<f32>>>> {
+        let safe: Vec<&str> = texts
+            .iter()
+            .map(|t| truncate_for_embedding(&self.tokenizer, t, self.token_budget))
+            .collect();
+        let (unique, positions) = group_unique_texts(&safe);
+        let hashes: Vec<[u8; 32]> = unique
+            .iter()
+            .map(|t| embedding_cache::text_hash(t))
+            .collect();
+        let mut out: Vec<Option<Vec<f32>>> = vec![None; texts.len()];
+        let primary = self.primary_space();
+
+        let mut pending: Vec<usize> = Vec::with_capacity(unique.len());
+        for (u, hash) in hashes.iter().enumerate() {
+            if self.cache_capacity > 0 {
+                if let Some(vec) = embedding_cache::lookup(&(primary.id, *hash)) {
+                    fan_out(&mut out, &positions[u], vec);
+                    continue;
+                }
+            }
+            pending.push(u);
+        }
+        if self.disk_cache_capacity > 0 && !pending.is_empty() {
+            let wanted: Vec<[u8; 32]> = pending.iter().map(|&u| hashes[u]).collect();
+            let found = embedding_disk_cache::lookup_many(&primary.name, &wanted);
+            let mut missed = Vec::with_capacity(pending.len());
+            for (u, hit) in pending.into_iter().zip(found) {
+                match hit {
+                    Some(vec) => {
+                        self.remember(primary, hashes[u], &vec);
+                        fan_out(&mut out, &positions[u], vec);
+                    }
+                    None => missed.push(u),
+                }
+            }
+            pending = missed;
         }
+        pending.sort_by_key(|&u| std::cmp::Reverse(unique[u].len()));
 
-        let ollama_err = ollama_result.unwrap_err();
+        let tokens: Vec<usize> = unique
+            .iter()
+            .map(|t| estimate_embedding_tokens(&self.tokenizer, t))
+            .collect();
+        let chunks = pack_batches(
+            &pending,
+            |u| tokens[u],
+            EMBED_BATCH_SIZE,
+            EMBED_BATCH_MAX_TOKENS,
+        );
+        let unique = &unique;
+        let results: Vec<_> = stream::iter(chunks.into_iter().enumerate())
+            .map(|(n, chunk)| async move {
+                // Stagger the first wave so concurrent requests don't hit the
+                // provider's rate limiter in the same instant.
+                if n > 0 && n < self.max_concurrency {
+                    let jitter_ms = rand::rng().random_range(0..BATCH_JITTER_MAX_MS);
+                    tokio::time::sleep(Duration::from_millis(jitter_ms)).await;
+                }
+                let chunk_texts: Vec<&str> = chunk.iter().map(|&u| unique[u]).collect();
+                (chunk, self.embed_uncached(&chunk_texts).await)
+            })
+            .buffer_unordered(self.max_concurrency)
+            .collect()
+            .await;
 
-        // If model not found, try auto-pulling it (once per session)
-        let ollama_err_str = ollama_err.to_string();
-        if (ollama_err_str.contains("not found")
-            || ollama_err_str.contains("404")
-            || ollama_err_str.contains("does not exist"))
-            && !MODEL_PULL_ATTEMPTED.swap(true, Ordering::SeqCst)
-        {
-            info!(
-                "[memory] Model '{}' not found, attempting auto-pull...",
-                self.model
-            );
-            match self.pull_model().await {
-                Ok(()) => {
-                    info!(
-                        "[memory] Model '{}' pulled successfully, retrying embed",
-                        self.model
-                    );
-                    let retry = self.embed_ollama(text).await;
-                    if let Ok(vec) = retry {
-                        return Ok(vec);
+        let mut any_ok = pending.is_empty();
+        let mut last_err = None;
+        for (chunk, result) in results {
+            match result {
+                Ok((vecs, space)) => {
+                    any_ok = true;
+                    let fresh: Vec<([u8; 32], &[f32])> = chunk
+                        .iter()
+                        .zip(&vecs)
+                        .map(|(&u, vec)| (hashes[u], vec.as_slice()))
+                        .collect();
+                    self.persist(space, &fresh);
+                    for (&u, vec) in chunk.iter().zip(vecs) {
+                        self.remember(space, hashes[u], &vec);
+                        fan_out(&mut out, &positions[u], vec);
                     }
                 }
                 Err(e) => {
-                    warn!("[memory] Auto-pull failed: {}", e);
+                    warn!(
+                        "[memory] Embedding batch of {} texts failed: {}",
+                        chunk.len(),
+                        e
+                    );
+                    last_err = Some(e);
                 }
             }
         }
 
+        match last_err {
+            Some(e) if !any_ok => Err(e),
+            _ => Ok(out),
+        }
+    }
+
+    /// Send (already truncated) texts through the configured route,
+    /// bypassing the caches.  The returned vectors are aligned with `texts`
+    /// and tagged with the space of the backend that produced them.
+    async fn embed_uncached(&self, texts: &[&str]) -> EngineResult<Routed<'_>> {
+        match self.provider {
+            EmbeddingProvider::Ollama => self.embed_route_ollama(texts).await,
+            EmbeddingProvider::OpenAI => self.embed_route_openai(texts).await,
+            EmbeddingProvider::Google => self.embed_route_google(texts).await,
+            EmbeddingProvider::Provider => self.embed_route_provider(texts).await,
+            EmbeddingProvider::Auto => self.embed_route_auto(texts).await,
+        }
+    }
+
+    /// Record a vector from `space` (keyed by its text's hash) in the
+    /// enabled in-memory cache layers.
+    fn remember(&self, space: &VectorSpace, hash: [u8; 32], vec: &[f32]) {
+        let caching = self.cache_capacity > 0;
+        let semantic = self.semantic_threshold.is_some();
+        if !caching && !semantic {
+            return;
+        }
+        // One exact-size allocation shared by both layers.
+        let shared: Arc<[f32]> = Arc::from(vec);
+        if caching {
+            let key = (space.id, hash);
+            embedding_cache::store(key, Arc::clone(&shared), self.cache_capacity);
+        }
+        if semantic {
+            embedding_cache::remember_similar(space.id, hash, shared);
+        }
+    }
+
+    /// Write freshly computed vectors from `space` to the persistent cache,
+    /// if enabled.
+    fn persist(&self, space: &VectorSpace, entries: &[([u8; 32], &[f32])]) {
+        if self.disk_cache_capacity == 0 || entries.is_empty() {
+            return;
+        }
+        embedding_disk_cache::store_many(&space.name, entries, self.disk_cache_capacity);
+    }
+
+    // ── Route: Auto (legacy cascade) ─────────────────────────────────────
+    async fn embed_route_auto(&self, texts: &[&str]) -> EngineResult<Routed<'_>> {
+        // Try Ollama format first (new /api/embed endpoint, then legacy /api/embeddings)
+        let ollama_result = self.embed_ollama(texts).await;
+        if let Ok(vec) = ollama_result {
+            return Ok((vec, &self.base_space));
+        }
+
+        let ollama_err = ollama_result.unwrap_err();
+        if let Some(vecs) = self.retry_after_auto_pull(texts, &ollama_err).await {
+            return Ok((vecs, &self.base_space));
+        }
+
         // Try OpenAI-compatible format at the same base_url: POST /v1/embeddings
-        let openai_result = self.embed_openai(text).await;
+        let openai_result = self.embed_openai(texts).await;
         if let Ok(vec) = openai_result {
-            return Ok(vec);
+            return Ok((vec, &self.base_space));
         }
         let openai_err = openai_result.unwrap_err();
 
@@ -148,16 +453,13 @@ impl EmbeddingClient {
                 ).into());
             }
             info!("[memory] Ollama unavailable, falling back to provider for embeddings");
-            let fb_result = self.embed_openai_provider(text, fb).await;
+            let fb_result = self.embed_openai_provider(texts, fb).await;
             if let Ok(vec) = fb_result {
-                return Ok(vec);
+                return Ok((vec, &self.fallback_space));
             }
             let fb_err = fb_result.unwrap_err();
             // Detect "OperationNotSupported" and flip the circuit breaker
-            let fb_err_str = fb_err.to_string();
-            if fb_err_str.contains("OperationNotSupported")
-                || fb_err_str.contains("does not work with the specified model")
-            {
+            if error_mentions(&fb_err, EMBED_UNSUPPORTED_MARKERS) {
                 warn!("[memory] Provider does not support embeddings — disabling provider fallback for this session");
                 PROVIDER_EMBED_UNSUPPORTED.store(true, Ordering::Relaxed);
             }
@@ -175,71 +477,83 @@ impl EmbeddingClient {
         .into())
     }
 
+    /// If `err` says the Ollama model is missing, pull it (once per session)
+    /// and retry.  `None` when no pull was attempted or the retry failed.
+    async fn retry_after_auto_pull(
+        &self,
+        texts: &[&str],
+        err: &EngineError,
+    ) -> Option<Vec<Vec<f32>>> {
+        if !error_mentions(err, MODEL_MISSING_MARKERS)
+            || MODEL_PULL_ATTEMPTED.swap(true, Ordering::SeqCst)
+        {
+            return None;
+        }
+        info!(
+            "[memory] Model '{}' not found, attempting auto-pull...",
+            self.model
+        );
+        match self.pull_model().await {
+            Ok(()) => {
+                info!(
+                    "[memory] Model '{}' pulled successfully, retrying embed",
+                    self.model
+                );
+                self.embed_ollama(texts).await.ok()
+            }
+            Err(e) => {
+                warn!("[memory] Auto-pull failed: {}", e);
+                None
+            }
+        }
+    }
+
     // ── Route: Ollama only ───────────────────────────────────────────────
-    async fn embed_route_ollama(&self, text: &str) -> EngineResult<Vec<f32>> {
-        let result = self.embed_ollama(text).await;
+    async fn embed_route_ollama(&self, texts: &[&str]) -> EngineResult<Routed<'_>> {
+        let result = self.embed_ollama(texts).await;
         if let Ok(vec) = result {
-            return Ok(vec);
+            return Ok((vec, &self.base_space));
         }
         let err = result.unwrap_err();
-
-        // Auto-pull once on model-not-found
-        let err_str = err.to_string();
-        if (err_str.contains("not found")
-            || err_str.contains("404")
-            || err_str.contains("does not exist"))
-            && !MODEL_PULL_ATTEMPTED.swap(true, Ordering::SeqCst)
-        {
-            info!(
-                "[memory] Model '{}' not found, attempting auto-pull...",
-                self.model
-            );
-            if self.pull_model().await.is_ok() {
-                let retry = self.embed_ollama(text).await;
-                if let Ok(vec) = retry {
-                    return Ok(vec);
-                }
-            }
+        if let Some(vecs) = self.retry_after_auto_pull(texts, &err).await {
+            return Ok((vecs, &self.base_space));
         }
 
         // Fall back to provider if available
         if let Some(ref fb) = self.openai_fallback {
             info!("[memory] Ollama failed, falling back to provider for embeddings");
-            return self.embed_openai_provider(text, fb).await;
+            let vecs = self.embed_openai_provider(texts, fb).await?;
+            return Ok((vecs, &self.fallback_space));
         }
         Err(err)
     }
 
     // ── Route: OpenAI direct ─────────────────────────────────────────────
-    async fn embed_route_openai(&self, text: &str) -> EngineResult<Vec<f32>> {
+    async fn embed_route_openai(&self, texts: &[&str]) -> EngineResult<Routed<'_>> {
         // Use the configured base_url with /v1/embeddings (or provider fallback)
         if let Some(ref fb) = self.openai_fallback {
-            let result = self.embed_openai_provider(text, fb).await;
-            if result.is_ok() {
-                return result;
+            match self.embed_openai_provider(texts, fb).await {
+                Ok(vecs) => return Ok((vecs, &self.fallback_space)),
+                Err(e) => warn!("[memory] OpenAI provider embedding failed: {}", e),
             }
-            warn!(
-                "[memory] OpenAI provider embedding failed: {}",
-                result.as_ref().unwrap_err()
-            );
         }
         // Try base_url as OpenAI-compatible endpoint
-        self.embed_openai(text).await
+        let vecs = self.embed_openai(texts).await?;
+        Ok((vecs, &self.base_space))
     }
 
     // ── Route: Google (Gemini) ───────────────────────────────────────────
-    async fn embed_route_google(&self, text: &str) -> EngineResult<Vec<f32>> {
+    async fn embed_route_google(&self, texts: &[&str]) -> EngineResult<Routed<'_>> {
         if let Some(ref fb) = self.openai_fallback {
-            let result = self.embed_google(text, fb).await;
-            if result.is_ok() {
-                return result;
+            let result = self.embed_google(texts, fb).await;
+            if let Ok(vecs) = result {
+                return Ok((vecs, &self.google_space));
             }
             let err = result.unwrap_err();
             warn!("[memory] Google embedding failed: {}", err);
             // Fall back to OpenAI provider format (some Google proxies use it)
-            let openai_result = self.embed_openai_provider(text, fb).await;
-            if openai_result.is_ok() {
-                return openai_result;
+            if let Ok(vecs) = self.embed_openai_provider(texts, fb).await {
+                return Ok((vecs, &self.fallback_space));
             }
             return Err(err);
         }
@@ -247,56 +561,43 @@ impl EmbeddingClient {
     }
 
     // ── Route: Use whatever chat provider is configured ──────────────────
-    async fn embed_route_provider(&self, text: &str) -> EngineResult<Vec<f32>> {
+    async fn embed_route_provider(&self, texts: &[&str]) -> EngineResult<Routed<'_>> {
         if let Some(ref fb) = self.openai_fallback {
             info!("[memory] Using configured chat provider for embeddings");
-            return self.embed_openai_provider(text, fb).await;
+            let vecs = self.embed_openai_provider(texts, fb).await?;
+            return Ok((vecs, &self.fallback_space));
         }
         Err("No chat provider configured — set up a provider in Settings first".into())
     }
 
     /// Ollama current API: POST /api/embed { model, input } → { embeddings: [[f32...]] }
     /// Falls back to legacy: POST /api/embeddings { model, prompt } → { embedding: [f32...] }
-    async fn embed_ollama(&self, text: &str) -> EngineResult<Vec<f32>> {
+    async fn embed_ollama(&self, texts: &[&str]) -> EngineResult<Vec<Vec<f32>>> {
         // ── Try new /api/embed endpoint first (Ollama 0.4+) ──
-        let new_url = format!("{}/api/embed", self.base_url.trim_end_matches('/'));
         let new_body = json!({
             "model": self.model,
-            "input": text,
+            "input": input_json(texts),
         });
 
-        let new_result = self
+        let new_req = self
             .client
-            .post(&new_url)
+            .post(&self.ollama_embed_url)
             .json(&new_body)
-            .timeout(std::time::Duration::from_secs(60))
-            .send()
-            .await;
+            .timeout(std::time::Duration::from_secs(60));
+        let new_result = send_with_retry(new_req, "Ollama").await;
 
         if let Ok(resp) = new_result {
             if resp.status().is_success() {
-                if let Ok(v) = resp.json::<Value>().await {
+                if let Ok(v) = decode_json::<OllamaEmbedResponse>(resp, "Ollama").await {
                     // New format returns { embeddings: [[f32...], ...] }
-                    if let Some(embeddings) = v["embeddings"].as_array() {
-                        if let Some(first) = embeddings.first().and_then(|e| e.as_array()) {
-                            let vec: Vec<f32> = first
-                                .iter()
-                                .filter_map(|v| v.as_f64().map(|f| f as f32))
-                                .collect();
-                            if !vec.is_empty() {
-                                return Ok(vec);
-                            }
-                        }
+                    if v.embeddings.len() == texts.len()
+                        && v.embeddings.iter().all(|v| !v.is_empty())
+                    {
+                        return Ok(v.embeddings);
                     }
                     // Some Ollama versions return singular "embedding" even on /api/embed
-                    if let Some(embedding) = v["embedding"].as_array() {
-                        let vec: Vec<f32> = embedding
-                            .iter()
-                            .filter_map(|v| v.as_f64().map(|f| f as f32))
-                            .collect();
-                        if !vec.is_empty() {
-                            return Ok(vec);
-                        }
+                    if texts.len() == 1 && !v.embedding.is_empty() {
+                        return Ok(vec![v.embedding]);
                     }
                 }
             } else {
@@ -315,205 +616,135 @@ impl EmbeddingClient {
             }
         }
 
-        // ── Fall back to legacy /api/embeddings endpoint ──
-        let legacy_url = format!("{}/api/embeddings", self.base_url.trim_end_matches('/'));
-        let legacy_body = json!({
-            "model": self.model,
-            "prompt": text,
-        });
-
-        let resp = self
-            .client
-            .post(&legacy_url)
-            .json(&legacy_body)
-            .timeout(std::time::Duration::from_secs(60))
-            .send()
-            .await
-            .map_err(|e| {
+        // ── Fall back to legacy /api/embeddings endpoint (one text per call) ──
+        let mut vecs = Vec::with_capacity(texts.len());
+        for text in texts {
+            let legacy_body = json!({
+                "model": self.model,
+                "prompt": text,
+            });
+
+            let legacy_req = self
+                .client
+                .post(&self.ollama_legacy_url)
+                .json(&legacy_body)
+                .timeout(std::time::Duration::from_secs(60));
+            let resp = send_with_retry(legacy_req, "Ollama").await.map_err(|e| {
                 format!(
                     "Ollama not reachable at {} — is Ollama running? Error: {}",
                     self.base_url, e
                 )
             })?;
 
-        if !resp.status().is_success() {
-            let status = resp.status();
-            let text = resp.text().await.unwrap_or_default();
-            return Err(format!("Ollama embed {} — {}", status, text).into());
-        }
-
-        let v: Value = resp.json().await?;
-
-        let embedding = v["embedding"]
-            .as_array()
-            .ok_or_else(|| "No 'embedding' array in Ollama response".to_string())?;
-
-        let vec: Vec<f32> = embedding
-            .iter()
-            .filter_map(|v| v.as_f64().map(|f| f as f32))
-            .collect();
-
-        if vec.is_empty() {
-            return Err("Empty embedding vector from Ollama".into());
+            let resp = ensure_success(resp, "Ollama embed").await?;
+            let v: OllamaEmbedResponse = decode_json(resp, "Ollama").await?;
+            if v.embedding.is_empty() {
+                return Err("Empty embedding vector from Ollama".into());
+            }
+            vecs.push(v.embedding);
         }
 
-        Ok(vec)
+        Ok(vecs)
     }
 
     /// OpenAI-compatible format: POST /v1/embeddings { model, input }
-    async fn embed_openai(&self, text: &str) -> EngineResult<Vec<f32>> {
-        let url = format!("{}/v1/embeddings", self.base_url.trim_end_matches('/'));
-        let body = json!({
-            "model": self.model,
-            "input": text,
-        });
-
-        let resp = self
-            .client
-            .post(&url)
-            .json(&body)
-            .timeout(std::time::Duration::from_secs(30))
-            .send()
-            .await?;
-
-        if !resp.status().is_success() {
-            let status = resp.status();
-            let text = resp.text().await.unwrap_or_default();
-            return Err(format!("OpenAI embed {} — {}", status, text).into());
-        }
-
-        let v: Value = resp.json().await?;
-
-        let embedding = v["data"][0]["embedding"]
-            .as_array()
-            .ok_or_else(|| "No 'data[0].embedding' array in OpenAI response".to_string())?;
-
-        let vec: Vec<f32> = embedding
-            .iter()
-            .filter_map(|v| v.as_f64().map(|f| f as f32))
-            .collect();
-
-        if vec.is_empty() {
-            return Err("Empty embedding vector from OpenAI format".into());
-        }
-
-        Ok(vec)
+    async fn embed_openai(&self, texts: &[&str]) -> EngineResult<Vec<Vec<f32>>> {
+        let req = self.client.post(&self.openai_embed_url);
+        self.post_openai_embeddings(req, &self.model, texts, "OpenAI format")
+            .await
     }
 
     /// Call the user's configured OpenAI provider for embeddings.
     async fn embed_openai_provider(
         &self,
-        text: &str,
+        texts: &[&str],
         fb: &OpenAiFallback,
-    ) -> EngineResult<Vec<f32>> {
-        let base = fb.base_url.trim_end_matches('/');
-        let url = if base.contains(".azure.com") {
-            // Azure: embeddings endpoint with api-version
-            if base.contains('?') {
-                format!("{}/embeddings", base)
-            } else {
-                format!("{}/embeddings?api-version=2024-05-01-preview", base)
-            }
-        } else {
-            format!("{}/embeddings", base)
-        };
+    ) -> EngineResult<Vec<Vec<f32>>> {
+        let req = self
+            .client
+            .post(&self.fallback_embed_url)
+            .headers(self.fallback_headers.clone());
+        let vecs = self
+            .post_openai_embeddings(req, &fb.embedding_model, texts, "OpenAI provider")
+            .await?;
+
+        info!(
+            "[memory] OpenAI provider embedding OK ({} × {} dims)",
+            vecs.len(),
+            vecs.first().map_or(0, |v| v.len())
+        );
+        Ok(vecs)
+    }
 
+    /// Send an OpenAI-format `{ model, input }` embeddings request and return
+    /// the vectors in input order.  `req` carries the URL and any auth.
+    async fn post_openai_embeddings(
+        &self,
+        req: reqwest::RequestBuilder,
+        model: &str,
+        texts: &[&str],
+        source: &str,
+    ) -> EngineResult<Vec<Vec<f32>>> {
         let body = json!({
-            "model": fb.embedding_model,
-            "input": text,
+            "model": model,
+            "input": input_json(texts),
         });
 
-        let mut req = self
-            .client
-            .post(&url)
-            .json(&body)
-            .timeout(std::time::Duration::from_secs(30));
-
-        // Azure uses api-key header; standard OpenAI uses Bearer token
-        if fb.base_url.contains(".azure.com") {
-            req = req.header("api-key", &fb.api_key);
-        } else {
-            req = req.bearer_auth(&fb.api_key);
-        }
-
-        let resp = req
-            .send()
+        let req = req.json(&body).timeout(std::time::Duration::from_secs(30));
+        let resp = send_with_retry(req, source)
             .await
-            .map_err(|e| format!("OpenAI provider embed request failed: {}", e))?;
-
-        if !resp.status().is_success() {
-            let status = resp.status();
-            let text = resp.text().await.unwrap_or_default();
-            return Err(format!("OpenAI provider embed {} — {}", status, text).into());
-        }
-
-        let v: Value = resp.json().await?;
-        let embedding = v["data"][0]["embedding"]
-            .as_array()
-            .ok_or_else(|| "No 'data[0].embedding' in OpenAI provider response".to_string())?;
+            .map_err(|e| format!("{} embed request failed: {}", source, e))?;
 
-        let vec: Vec<f32> = embedding
-            .iter()
-            .filter_map(|v| v.as_f64().map(|f| f as f32))
-            .collect();
-
-        if vec.is_empty() {
-            return Err("Empty embedding vector from OpenAI provider".into());
-        }
-
-        info!("[memory] OpenAI provider embedding OK ({} dims)", vec.len());
-        Ok(vec)
+        let resp = ensure_success(resp, source).await?;
+        let v: OpenAiEmbeddingResponse = decode_json(resp, source).await?;
+        Ok(order_openai_data(v, texts.len(), source)?)
     }
 
     /// Google Gemini embedding: POST models/{model}:embedContent
     /// https://ai.google.dev/gemini-api/docs/embeddings
-    async fn embed_google(&self, text: &str, fb: &OpenAiFallback) -> EngineResult<Vec<f32>> {
-        let model = if fb.embedding_model.is_empty() {
-            "text-embedding-004"
-        } else {
-            &fb.embedding_model
-        };
-        let base = fb.base_url.trim_end_matches('/');
-        let url = format!("{}/models/{}:embedContent?key={}", base, model, fb.api_key);
+    async fn embed_google(
+        &self,
+        texts: &[&str],
+        fb: &OpenAiFallback,
+    ) -> EngineResult<Vec<Vec<f32>>> {
+        let model = google_embedding_model(fb);
+        let url = format!(
+            "{}/models/{}:embedContent?key={}",
+            fb.base_url, model, fb.api_key
+        );
 
-        let body = json!({
-            "model": format!("models/{}", model),
-            "content": {
-                "parts": [{ "text": text }]
+        let mut vecs = Vec::with_capacity(texts.len());
+        for text in texts {
+            let body = json!({
+                "model": format!("models/{}", model),
+                "content": {
+                    "parts": [{ "text": text }]
+                }
+            });
+
+            let req = self
+                .client
+                .post(&url)
+                .json(&body)
+                .timeout(std::time::Duration::from_secs(30));
+            let resp = send_with_retry(req, "Google")
+                .await
+                .map_err(|e| format!("Google embed request failed: {}", e))?;
+
+            let resp = ensure_success(resp, "Google embed").await?;
+            let v: GoogleEmbedResponse = decode_json(resp, "Google").await?;
+            if v.embedding.values.is_empty() {
+                return Err("Empty embedding vector from Google".into());
             }
-        });
-
-        let resp = self
-            .client
-            .post(&url)
-            .json(&body)
-            .timeout(std::time::Duration::from_secs(30))
-            .send()
-            .await
-            .map_err(|e| format!("Google embed request failed: {}", e))?;
-
-        if !resp.status().is_success() {
-            let status = resp.status();
-            let body_text = resp.text().await.unwrap_or_default();
-            return Err(format!("Google embed {} — {}", status, body_text).into());
-        }
-
-        let v: Value = resp.json().await?;
-        let values = v["embedding"]["values"]
-            .as_array()
-            .ok_or_else(|| "No 'embedding.values' in Google response".to_string())?;
-
-        let vec: Vec<f32> = values
-            .iter()
-            .filter_map(|v| v.as_f64().map(|f| f as f32))
-            .collect();
-
-        if vec.is_empty() {
-            return Err("Empty embedding vector from Google".into());
+            vecs.push(v.embedding.values);
         }
 
-        info!("[memory] Google embedding OK ({} dims)", vec.len());
-        Ok(vec)
+        info!(
+            "[memory] Google embedding OK ({} × {} dims)",
+            vecs.len(),
+            vecs.first().map_or(0, |v| v.len())
+        );
+        Ok(vecs)
     }
 
     /// Check if the embedding service is reachable and the model works.
@@ -527,7 +758,7 @@ impl EmbeddingClient {
     /// Returns the raw text response from the model.
     pub async fn classify_text(&self, prompt: &str) -> EngineResult<String> {
         // Try Ollama /api/generate endpoint
-        let url = format!("{}/api/generate", self.base_url.trim_end_matches('/'));
+        let url = format!("{}/api/generate", self.base_url);
         let body = json!({
             "model": self.model,
             "prompt": prompt,
@@ -582,17 +813,6 @@ impl EmbeddingClient {
         prompt: &str,
         fb: &OpenAiFallback,
     ) -> EngineResult<String> {
-        let base = fb.base_url.trim_end_matches('/');
-        let url = if base.contains(".azure.com") {
-            if base.contains('?') {
-                format!("{}/chat/completions", base)
-            } else {
-                format!("{}/chat/completions?api-version=2024-05-01-preview", base)
-            }
-        } else {
-            format!("{}/chat/completions", base)
-        };
-
         let mut body = json!({
             "model": fb.chat_model,
             "messages": [
@@ -601,39 +821,21 @@ impl EmbeddingClient {
             "max_tokens": 256,
         });
 
-        // gpt-5+ and reasoning models reject temperature != 1
-        let m = fb.chat_model.to_lowercase();
-        let skip_temp = m.starts_with("o1")
-            || m.starts_with("o3")
-            || m.starts_with("o4")
-            || m.starts_with("gpt-5");
-        if !skip_temp {
+        if !self.fallback_chat_fixed_temperature {
             body["temperature"] = json!(0.0);
         }
 
-        let mut req = self
+        let resp = self
             .client
-            .post(&url)
+            .post(&self.fallback_chat_url)
+            .headers(self.fallback_headers.clone())
             .json(&body)
-            .timeout(std::time::Duration::from_secs(30));
-
-        if fb.base_url.contains(".azure.com") {
-            req = req.header("api-key", &fb.api_key);
-        } else {
-            req = req.bearer_auth(&fb.api_key);
-        }
-
-        let resp = req
+            .timeout(std::time::Duration::from_secs(30))
             .send()
             .await
             .map_err(|e| format!("OpenAI provider classify failed: {}", e))?;
 
-        if !resp.status().is_success() {
-            let status = resp.status();
-            let text = resp.text().await.unwrap_or_default();
-            return Err(format!("OpenAI provider classify {} — {}", status, text).into());
-        }
-
+        let resp = ensure_success(resp, "OpenAI provider classify").await?;
         let v: Value = resp.json().await?;
         let text = v["choices"][0]["message"]["content"]
             .as_str()
@@ -648,24 +850,40 @@ impl EmbeddingClient {
         Ok(text)
     }
 
-    /// Check if Ollama is reachable.
+    /// Check if Ollama is reachable.  Reuses a result younger than
+    /// `OLLAMA_STATUS_TTL`; use [`check_ollama_running_fresh`] when the
+    /// answer must reflect the current state (e.g. right after starting it).
+    ///
+    /// [`check_ollama_running_fresh`]: Self::check_ollama_running_fresh
     pub async fn check_ollama_running(&self) -> EngineResult<bool> {
-        let url = format!("{}/api/tags", self.base_url.trim_end_matches('/'));
-        match self
+        if let Some(&(at, running)) = OLLAMA_STATUS.lock().get(&self.base_url) {
+            if at.elapsed() < OLLAMA_STATUS_TTL {
+                return Ok(running);
+            }
+        }
+        self.check_ollama_running_fresh().await
+    }
+
+    /// Probe Ollama now, bypassing and refreshing the cached status.
+    pub async fn check_ollama_running_fresh(&self) -> EngineResult<bool> {
+        let url = format!("{}/api/tags", self.base_url);
+        let running = match self
             .client
             .get(&url)
             .timeout(std::time::Duration::from_secs(5))
             .send()
             .await
         {
-            Ok(resp) => Ok(resp.status().is_success()),
-            Err(_) => Ok(false),
-        }
+            Ok(resp) => resp.status().is_success(),
+            Err(_) => false,
+        };
+        record_ollama_status(&self.base_url, running);
+        Ok(running)
     }
 
     /// Check if the configured model is available in Ollama.
     pub async fn check_model_available(&self) -> EngineResult<bool> {
-        let url = format!("{}/api/tags", self.base_url.trim_end_matches('/'));
+        let url = format!("{}/api/tags", self.base_url);
         let resp = self
             .client
             .get(&url)
@@ -677,31 +895,24 @@ impl EmbeddingClient {
             return Err("Ollama returned an error".into());
         }
 
-        let v: Value = resp.json().await?;
+        let v: OllamaTagsResponse = decode_json(resp, "Ollama tags").await?;
 
-        if let Some(models) = v["models"].as_array() {
-            let model_base = self.model.split(':').next().unwrap_or(&self.model);
-            for m in models {
-                if let Some(name) = m["name"].as_str() {
-                    let name_base = name.split(':').next().unwrap_or(name);
-                    if name_base == model_base || name == self.model {
-                        return Ok(true);
-                    }
-                }
-                if let Some(name) = m["model"].as_str() {
-                    let name_base = name.split(':').next().unwrap_or(name);
-                    if name_base == model_base || name == self.model {
-                        return Ok(true);
-                    }
-                }
-            }
-        }
-        Ok(false)
+        let model_base = self.model.split(':').next().unwrap_or(&self.model);
+        let found = v
+            .models
+            .iter()
+            .flat_map(|m| [m.name.as_deref(), m.model.as_deref()])
+            .flatten()
+            .any(|name| {
+                let name_base = name.split(':').next().unwrap_or(name);
+                name_base == model_base || name == self.model
+            });
+        Ok(found)
     }
 
     /// Pull a model from Ollama. Blocks until download completes.
     pub async fn pull_model(&self) -> EngineResult<()> {
-        let url = format!("{}/api/pull", self.base_url.trim_end_matches('/'));
+        let url = format!("{}/api/pull", self.base_url);
         let body = json!({
             "name": self.model,
             "stream": false,
@@ -720,12 +931,7 @@ impl EmbeddingClient {
             .send()
             .await?;
 
-        if !resp.status().is_success() {
-            let status = resp.status();
-            let text = resp.text().await.unwrap_or_default();
-            return Err(format!("Pull failed {} — {}", status, text).into());
-        }
-
+        let resp = ensure_success(resp, "Pull failed").await?;
         let v: Value = resp.json().await.unwrap_or(json!({}));
         let status = v["status"].as_str().unwrap_or("unknown");
         info!("[memory] Model pull complete: {}", status);
@@ -738,7 +944,7 @@ impl EmbeddingClient {
     where
         F: FnMut(&str, u64, u64),
     {
-        let url = format!("{}/api/pull", self.base_url.trim_end_matches('/'));
+        let url = format!("{}/api/pull", self.base_url);
         let body = json!({
             "name": self.model,
             "stream": true,
@@ -757,12 +963,7 @@ impl EmbeddingClient {
             .send()
             .await?;
 
-        if !resp.status().is_success() {
-            let status = resp.status();
-            let text = resp.text().await.unwrap_or_default();
-            return Err(format!("Pull failed {} — {}", status, text).into());
-        }
-
+        let resp = ensure_success(resp, "Pull failed").await?;
         let body_text = resp.text().await?;
         for line in body_text.lines() {
             let line = line.trim();
@@ -781,3 +982,841 @@ impl EmbeddingClient {
         Ok(())
     }
 }
+
+/// One embedding model served at one endpoint.  Vectors are only
+/// comparable within a space, so cache entries are keyed by it.
+#[derive(Clone, Default)]
+struct VectorSpace {
+    /// `endpoint|model` — the key in the persistent cache.
+    name: String,
+    /// `embedding_cache::namespace_id(&name)` — the key in memory.
+    id: u64,
+}
+
+impl VectorSpace {
+    fn new(endpoint: &str, model: &str) -> Self {
+        let name = format!("{}|{}", endpoint, model);
+        VectorSpace {
+            id: embedding_cache::namespace_id(&name),
+            name,
+        }
+    }
+}
+
+/// Vectors from a route, tagged with the space of the backend that answered.
+type Routed<'a> = (Vec<Vec<f32>>, &'a VectorSpace);
+
+/// Gemini model used by `embed_google`.
+fn google_embedding_model(fb: &OpenAiFallback) -> &str {
+    if fb.embedding_model.is_empty() {
+        "text-embedding-004"
+    } else {
+        &fb.embedding_model
+    }
+}
+
+/// Input token limits of known embedding models, matched by substring.
+const EMBED_TOKEN_BUDGETS: &[(&str, usize)] = &[
+    ("text-embedding-3", 8191),
+    ("text-embedding-ada-002", 8191),
+    ("nomic-embed-text", 8192),
+    ("text-embedding-004", 2048),
+    ("gemini-embedding", 2048),
+    ("mxbai-embed-large", 512),
+    ("snowflake-arctic-embed", 512),
+    ("all-minilm", 256),
+];
+
+/// Budget for models not in `EMBED_TOKEN_BUDGETS` — the smallest context
+/// common among general-purpose embedding models.
+const DEFAULT_EMBED_TOKEN_BUDGET: usize = 2048;
+
+/// Max input tokens for an embedding model.
+fn embedding_token_budget(model: &str) -> usize {
+    let m = model.to_lowercase();
+    EMBED_TOKEN_BUDGETS
+        .iter()
+        .find(|(name, _)| m.contains(name))
+        .map_or(DEFAULT_EMBED_TOKEN_BUDGET, |&(_, budget)| budget)
+}
+
+/// Every hash under which `text` may be cached.  Clients key by the text
+/// truncated to their token budget with their model's tokenizer, so a long
+/// text can sit in the caches under several prefixes.
+pub(crate) fn cache_key_hashes(text: &str) -> Vec<[u8; 32]> {
+    if text.trim().is_empty() {
+        return Vec::new();
+    }
+    let budgets = EMBED_TOKEN_BUDGETS
+        .iter()
+        .map(|&(_, budget)| budget)
+        .chain([DEFAULT_EMBED_TOKEN_BUDGET]);
+    let mut hashes = Vec::new();
+    for kind in [
+        TokenizerType::Cl100kBase,
+        TokenizerType::Gemini,
+        TokenizerType::SentencePiece,
+    ] {
+        let tokenizer = Tokenizer::new(kind);
+        for budget in budgets.clone() {
+            let hash = embedding_cache::text_hash(truncate_for_embedding(&tokenizer, text, budget));
+            if !hashes.contains(&hash) {
+                hashes.push(hash);
+            }
+        }
+    }
+    hashes
+}
+
+/// Which tokenizer family an embedding model uses.
+fn embedding_tokenizer_type(model: &str) -> TokenizerType {
+    let m = model.to_lowercase();
+    if m.starts_with("text-embedding-3") || m.starts_with("text-embedding-ada") {
+        TokenizerType::Cl100kBase
+    } else if m.contains("gemini") || m.starts_with("text-embedding-004") {
+        TokenizerType::Gemini
+    } else {
+        TokenizerType::SentencePiece
+    }
+}
+
+/// Conservative token estimate for embedding input: the larger of the
+/// tokenizer's chars-per-token estimate and a dense count of words, ASCII
+/// punctuation and non-ASCII chars.  The latter tracks code and JSON (often
+/// ~2 chars/token) and CJK text (a token or more per char, with no spaces
+/// to split on), which a plain ratio underestimates badly enough to
+/// overflow the model's context.
+fn estimate_embedding_tokens(tokenizer: &Tokenizer, text: &str) -> usize {
+    let dense = text.split_whitespace().count()
+        + text.bytes().filter(u8::is_ascii_punctuation).count()
+        + text.chars().filter(|c| !c.is_ascii()).count();
+    tokenizer.count_tokens(text).max(dense)
+}
+
+/// Truncate `text` to fit `max_tokens` rather than fail on oversized input.
+/// Cuts on a char boundary (never panics on multi-byte chars like an em
+/// dash) and returns a prefix, so the result doubles as a cache key.
+fn truncate_for_embedding<'a>(tokenizer: &Tokenizer, text: &'a str, max_tokens: usize) -> &'a str {
+    let mut end = text.len();
+    loop {
+        let tokens = estimate_embedding_tokens(tokenizer, &text[..end]);
+        if tokens <= max_tokens {
+            return &text[..end];
+        }
+        // Shrink proportionally with 5% headroom, always making progress.
+        let target = (end as f64 * max_tokens as f64 / tokens as f64 * 0.95) as usize;
+        end = text.floor_char_boundary(target.min(end - 1));
+    }
+}
+
+/// Collapse a batch to its distinct non-blank texts.  Returns the texts in
+/// first-seen order plus, for each, every position it occupied in `texts`.
+fn group_unique_texts<'a>(texts: &[&'a str]) -> (Vec<&'a str>, Vec<Vec<usize>>) {
+    let mut index: HashMap<&str, usize> = HashMap::with_capacity(texts.len());
+    let mut unique = Vec::new();
+    let mut positions: Vec<Vec<usize>> = Vec::new();
+    for (i, &text) in texts.iter().enumerate() {
+        if text.trim().is_empty() {
+            continue;
+        }
+        let u = *index.entry(text).or_insert_with(|| {
+            unique.push(text);
+            positions.push(Vec::new());
+            unique.len() - 1
+        });
+        positions[u].push(i);
+    }
+    (unique, positions)
+}
+
+/// Write `vec` to every slot in `positions`, moving it into the last one.
+fn fan_out(out: &mut [Option<Vec<f32>>], positions: &[usize], vec: Vec<f32>) {
+    if let Some((&last, rest)) = positions.split_last() {
+        for &i in rest {
+            out[i] = Some(vec.clone());
+        }
+        out[last] = Some(vec);
+    }
+}
+
+/// Build a fallback-provider endpoint URL.  Azure deployments need an
+/// `api-version` query parameter unless the base URL already has one.
+fn fallback_url(base_url: &str, is_azure: bool, path: &str) -> String {
+    if is_azure && !base_url.contains('?') {
+        format!("{}/{}?api-version=2024-05-01-preview", base_url, path)
+    } else {
+        format!("{}/{}", base_url, path)
+    }
+}
+
+/// Auth headers for the fallback provider: Azure uses an `api-key` header,
+/// standard OpenAI uses a Bearer token.
+fn fallback_headers(api_key: &str, is_azure: bool) -> HeaderMap {
+    let (name, value) = if is_azure {
+        ("api-key", api_key.to_string())
+    } else {
+        (AUTHORIZATION.as_str(), format!("Bearer {}", api_key))
+    };
+    let mut headers = HeaderMap::new();
+    match HeaderValue::from_str(&value) {
+        Ok(mut v) => {
+            v.set_sensitive(true);
+            headers.insert(name, v);
+        }
+        Err(_) => warn!("[memory] Fallback API key contains invalid header characters"),
+    }
+    headers
+}
+
+/// Retries for a transient (429/5xx) embedding response.  Kept low: `Auto`
+/// routing has its own fallbacks and the memory layer degrades to keyword
+/// search, so a long retry chain would only stall the caller.
+const EMBED_MAX_RETRIES: u32 = 2;
+
+/// Longest wait before one embedding retry.  Embeds sit on the recall path
+/// of a chat turn, so a server asking for longer gets its response back at
+/// once and the caller falls back instead of blocking.
+const EMBED_MAX_RETRY_DELAY: Duration = Duration::from_secs(2);
+
+/// Delay before retry `attempt` (0-based), or `None` when the server's
+/// Retry-After exceeds `EMBED_MAX_RETRY_DELAY`.
+fn embed_retry_delay(attempt: u32, retry_after_secs: Option<u64>) -> Option<Duration> {
+    if retry_after_secs.is_some_and(|secs| Duration::from_secs(secs) > EMBED_MAX_RETRY_DELAY) {
+        return None;
+    }
+    Some(full_jitter_backoff(attempt, retry_after_secs).min(EMBED_MAX_RETRY_DELAY))
+}
+
+/// Send an embedding request, retrying retryable statuses with full-jitter
+/// backoff (honouring a short Retry-After).  Transport errors are returned
+/// at once so an unreachable backend falls through to the next route
+/// without delay.
+async fn send_with_retry(
+    req: reqwest::RequestBuilder,
+    source: &str,
+) -> reqwest::Result<reqwest::Response> {
+    let mut attempt = 0;
+    loop {
+        // Bodies here are always buffered JSON, so cloning only fails in theory.
+        let Some(this_try) = req.try_clone() else {
+            return req.send().await;
+        };
+        let resp = this_try.send().await?;
+        let status = resp.status().as_u16();
+        if !is_retryable_status(status) || attempt >= EMBED_MAX_RETRIES {
+            return Ok(resp);
+        }
+        let retry_after = resp
+            .headers()
+            .get(RETRY_AFTER)
+            .and_then(|v| v.to_str().ok())
+            .and_then(parse_retry_after);
+        let Some(delay) = embed_retry_delay(attempt, retry_after) else {
+            warn!(
+                "[memory] {} embed returned {} with Retry-After {}s — not waiting",
+                source,
+                status,
+                retry_after.unwrap_or_default()
+            );
+            return Ok(resp);
+        };
+        warn!(
+            "[memory] {} embed returned {} — retry {}/{} in {}ms",
+            source,
+            status,
+            attempt + 1,
+            EMBED_MAX_RETRIES,
+            delay.as_millis()
+        );
+        tokio::time::sleep(delay).await;
+        attempt += 1;
+    }
+}
+
+/// Split `pending` into consecutive batches, each holding at most
+/// `max_items` entries and `max_tokens` total tokens.  A single entry over
+/// `max_tokens` still gets a batch of its own.
+fn pack_batches(
+    pending: &[usize],
+    tokens: impl Fn(usize) -> usize,
+    max_items: usize,
+    max_tokens: usize,
+) -> Vec<&[usize]> {
+    let mut batches = Vec::new();
+    let mut start = 0;
+    let mut batch_tokens = 0;
+    for (i, &u) in pending.iter().enumerate() {
+        let t = tokens(u);
+        let full = i - start >= max_items || batch_tokens + t > max_tokens;
+        if i > start && full {
+            batches.push(&pending[start..i]);
+            start = i;
+            batch_tokens = 0;
+        }
+        batch_tokens += t;
+    }
+    if start < pending.len() {
+        batches.push(&pending[start..]);
+    }
+    batches
+}
+
+/// gpt-5+ and reasoning models reject temperature != 1.
+fn chat_model_fixed_temperature(model: &str) -> bool {
+    let m = model.to_lowercase();
+    ["o1", "o3", "o4", "gpt-5"]
+        .iter()
+        .any(|prefix| m.starts_with(prefix))
+}
+
+/// Error text meaning the Ollama model isn't installed (worth an auto-pull).
+const MODEL_MISSING_MARKERS: &[&str] = &["not found", "404", "does not exist"];
+
+/// Error text meaning the provider's model cannot produce embeddings at all.
+const EMBED_UNSUPPORTED_MARKERS: &[&str] = &[
+    "OperationNotSupported",
+    "does not work with the specified model",
+];
+
+/// Whether `err`'s message contains any of `markers`.
+fn error_mentions(err: &EngineError, markers: &[&str]) -> bool {
+    let text = err.to_string();
+    markers.iter().any(|m| text.contains(m))
+}
+
+/// Pass a successful response through; turn any other status into an error
+/// carrying the status and response body, prefixed with `what`.
+async fn ensure_success(resp: reqwest::Response, what: &str) -> EngineResult<reqwest::Response> {
+    let status = resp.status();
+    if status.is_success() {
+        return Ok(resp);
+    }
+    let text = resp.text().await.unwrap_or_default();
+    Err(format!("{} {} — {}", what, status, text).into())
+}
+
+/// Request `input` field: a bare string for one text (what every
+/// OpenAI-compatible server accepts), an array for a batch.
+fn input_json(texts: &[&str]) -> Value {
+    match texts {
+        [single] => json!(single),
+        _ => json!(texts),
+    }
+}
+
+// ── Response decoding ──────────────────────────────────────────────────
+//
+// Embedding responses are decoded straight into typed structs: serde parses
+// each number directly into an `f32` instead of first building a
+// `serde_json::Value` node per element (1–3K floats per vector).
+
+/// OpenAI-compatible `/embeddings` response.
+#[derive(Deserialize)]
+struct OpenAiEmbeddingResponse {
+    data: Vec<OpenAiEmbeddingItem>,
+}
+
+#[derive(Deserialize)]
+struct OpenAiEmbeddingItem {
+    #[serde(default)]
+    index: Option<usize>,
+    embedding: Vec<f32>,
+}
+
+/// Ollama `/api/embed` (`embeddings`) or legacy `/api/embeddings` (`embedding`).
+#[derive(Deserialize)]
+struct OllamaEmbedResponse {
+    #[serde(default)]
+    embeddings: Vec<Vec<f32>>,
+    #[serde(default)]
+    embedding: Vec<f32>,
+}
+
+/// Google `embedContent` response.
+#[derive(Deserialize)]
+struct GoogleEmbedResponse {
+    embedding: GoogleEmbedding,
+}
+
+#[derive(Deserialize)]
+struct GoogleEmbedding {
+    values: Vec<f32>,
+}
+
+/// Ollama `/api/tags` — only the model identifiers are decoded; the rest
+/// of each entry (details, digests, sizes) is skipped without allocating.
+#[derive(Deserialize)]
+struct OllamaTagsResponse {
+    #[serde(default)]
+    models: Vec<OllamaModelTag>,
+}
+
+#[derive(Deserialize)]
+struct OllamaModelTag {
+    #[serde(default)]
+    name: Option<String>,
+    #[serde(default)]
+    model: Option<String>,
+}
+
+/// Read a response body and decode it as `T`, labelling decode failures
+/// with `source` so they stay as readable as the old per-field checks.
+async fn decode_json<T: DeserializeOwned>(
+    resp: reqwest::Response,
+    source: &str,
+) -> EngineResult<T> {
+    let body = resp.bytes().await?;
+    serde_json::from_slice(&body)
+        .map_err(|e| format!("Malformed {} response: {}", source, e).into())
+}
+
+/// Place OpenAI-format embeddings in request order.  Items are positioned
+/// by their `index` field — the API does not promise to return them in
+/// input order.
+fn order_openai_data(
+    resp: OpenAiEmbeddingResponse,
+    expected: usize,
+    source: &str,
+) -> Result<Vec<Vec<f32>>, String> {
+    if resp.data.len() != expected {
+        return Err(format!(
+            "{} returned {} embeddings for {} inputs",
+            source,
+            resp.data.len(),
+            expected
+        ));
+    }
+
+    let mut out = vec![Vec::new(); expected];
+    for (pos, item) in resp.data.into_iter().enumerate() {
+        let idx = item.index.unwrap_or(pos);
+        if idx < expected {
+            out[idx] = item.embedding;
+        }
+    }
+    if out.iter().any(|v| v.is_empty()) {
+        return Err(format!("Empty embedding vector from {}", source));
+    }
+    Ok(out)
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    fn fallback(base_url: &str) -> OpenAiFallback {
+        OpenAiFallback {
+            api_key: "k".into(),
+            base_url: base_url.into(),
+            embedding_model: "text-embedding-3-small".into(),
+            chat_model: "gpt-4.1-mini".into(),
+        }
+    }
+
+    #[test]
+    fn fallback_endpoints_are_precomputed_per_provider() {
+        let client = EmbeddingClient::new(&MemoryConfig::default());
+
+        let openai = client
+            .clone()
+            .with_openai_fallback(fallback("https://api.openai.com/v1/"));
+        assert_eq!(
+            openai.fallback_embed_url,
+            "https://api.openai.com/v1/embeddings"
+        );
+        assert_eq!(openai.fallback_headers[AUTHORIZATION], "Bearer k");
+        assert!(openai.fallback_headers.get("api-key").is_none());
+
+        let azure = client
+            .clone()
+            .with_openai_fallback(fallback("https://x.openai.azure.com/openai/deployments/d"));
+        assert_eq!(
+            azure.fallback_chat_url,
+            "https://x.openai.azure.com/openai/deployments/d/chat/completions?api-version=2024-05-01-preview"
+        );
+        assert_eq!(azure.fallback_headers["api-key"], "k");
+        assert!(azure.fallback_headers.get(AUTHORIZATION).is_none());
+
+        let pinned = client.with_openai_fallback(fallback(
+            "https://x.openai.azure.com/openai/deployments/d?api-version=2024-10-21",
+        ));
+        assert!(!pinned.fallback_embed_url.contains("2024-05-01"));
+    }
+
+    /// Serve OpenAI-format `/embeddings` on a local port.  Each input's
+    /// vector is its bytes as floats, so callers can check alignment; a
+    /// request containing an input that starts with "fail" gets a 400.
+    /// Returns the base URL and a counter of requests served.
+    async fn stub_openai_server() -> (String, Arc<std::sync::atomic::AtomicUsize>) {
+        use tokio::io::{AsyncReadExt, AsyncWriteExt};
+
+        let listener = tokio::net::TcpListener::bind("127.0.0.1:0").await.unwrap();
+        let addr = listener.local_addr().unwrap();
+        let requests = Arc::new(std::sync::atomic::AtomicUsize::new(0));
+        let counter = Arc::clone(&requests);
+        tokio::spawn(async move {
+            while let Ok((mut sock, _)) = listener.accept().await {
+                counter.fetch_add(1, Ordering::SeqCst);
+                tokio::spawn(async move {
+                    let mut buf = Vec::new();
+                    let mut chunk = [0u8; 8192];
+                    let body = loop {
+                        let n = sock.read(&mut chunk).await.unwrap();
+                        buf.extend_from_slice(&chunk[..n]);
+                        let text = String::from_utf8_lossy(&buf);
+                        let Some(end) = text.find("\r\n\r\n") else {
+                            continue;
+                        };
+                        let len: usize = text[..end]
+                            .lines()
+                            .find_map(|l| {
+                                let (k, v) = l.split_once(':')?;
+                                k.eq_ignore_ascii_case("content-length")
+                                    .then(|| v.trim().parse().ok())?
+                            })
+                            .unwrap_or(0);
+                        if buf.len() >= end + 4 + len {
+                            break serde_json::from_slice::<Value>(&buf[end + 4..]).unwrap();
+                        }
+                    };
+                    let inputs: Vec<String> = match &body["input"] {
+                        Value::String(s) => vec![s.clone()],
+                        v => serde_json::from_value(v.clone()).unwrap(),
+                    };
+                    let (status, reply) = if inputs.iter().any(|t| t.starts_with("fail")) {
+                        (400, json!({ "error": "rejected" }))
+                    } else {
+                        let data: Vec<Value> = inputs
+                            .iter()
+                            .enumerate()
+                            .map(|(i, t)| {
+                                let v: Vec<f32> = t.bytes().map(f32::from).collect();
+                                json!({ "index": i, "embedding": v })
+                            })
+                            .collect();
+                        (200, json!({ "data": data }))
+                    };
+                    let reply = reply.to_string();
+                    let resp = format!(
+                        "HTTP/1.1 {} Stub\r\nContent-Type: application/json\r\nContent-Length: {}\r\nConnection: close\r\n\r\n{}",
+                        status,
+                        reply.len(),
+                        reply
+                    );
+                    let _ = sock.write_all(resp.as_bytes()).await;
+                });
+            }
+        });
+        (format!("http://{}", addr), requests)
+    }
+
+    /// Decode a stub-server vector back into the text it was made from.
+    fn stub_text(vec: &[f32]) -> String {
+        vec.iter().map(|&b| b as u8 as char).collect()
+    }
+
+    #[test]
+    fn primary_space_follows_the_route() {
+        let with = |provider| {
+            EmbeddingClient::new(&MemoryConfig {
+                embedding_provider: provider,
+                ..Default::default()
+            })
+            .with_openai_fallback(fallback("https://api.openai.com/v1"))
+        };
+        for provider in [EmbeddingProvider::Auto, EmbeddingProvider::Ollama] {
+            let client = with(provider);
+            assert_eq!(client.primary_space().id, client.base_space.id);
+        }
+        for provider in [EmbeddingProvider::OpenAI, EmbeddingProvider::Provider] {
+            let client = with(provider);
+            assert_eq!(client.primary_space().id, client.fallback_space.id);
+        }
+        let client = with(EmbeddingProvider::Google);
+        assert_eq!(client.primary_space().id, client.google_space.id);
+        assert_ne!(client.base_space.id, client.fallback_space.id);
+    }
+
+    #[tokio::test]
+    async fn fallback_vectors_are_not_served_for_the_primary() {
+        let (url, _) = stub_openai_server().await;
+        // Nothing listens on port 1, so Ollama fails fast and the fallback answers.
+        let client = EmbeddingClient::new(&MemoryConfig {
+            embedding_provider: EmbeddingProvider::Ollama,
+            embedding_base_url: "http://127.0.0.1:1".into(),
+            embedding_disk_cache_capacity: 0,
+            ..Default::default()
+        })
+        .with_openai_fallback(fallback(&url));
+
+        let text = "fallback-space keying probe";
+        let vec = client.embed(text).await.unwrap();
+        assert_eq!(stub_text(&vec), text);
+
+        let hash = embedding_cache::text_hash(text);
+        assert_eq!(
+            embedding_cache::lookup(&(client.fallback_space.id, hash)),
+            Some(vec)
+        );
+        assert_eq!(embedding_cache::lookup(&(client.base_space.id, hash)), None);
+    }
+
+    /// A client that embeds through the stub server, with caching off.
+    fn stub_client(url: &str) -> EmbeddingClient {
+        EmbeddingClient::new(&MemoryConfig {
+            embedding_provider: EmbeddingProvider::Provider,
+            embedding_cache_capacity: 0,
+            embedding_disk_cache_capacity: 0,
+            ..Default::default()
+        })
+        .with_openai_fallback(fallback(url))
+    }
+
+    #[tokio::test]
+    async fn embed_batch_aligns_results_with_inputs() {
+        let (url, requests) = stub_openai_server().await;
+        let client = stub_client(&url);
+
+        let texts = ["alpha", "", "beta", "alpha", "gamma"];
+        let out = client.embed_batch(&texts).await.unwrap();
+        let decoded: Vec<Option<String>> =
+            out.iter().map(|v| v.as_deref().map(stub_text)).collect();
+        assert_eq!(
+            decoded,
+            vec![
+                Some("alpha".into()),
+                None,
+                Some("beta".into()),
+                Some("alpha".into()),
+                Some("gamma".into())
+            ]
+        );
+        assert_eq!(requests.load(Ordering::SeqCst), 1);
+    }
+
+    #[tokio::test]
+    async fn embed_batch_keeps_chunks_that_succeed() {
+        let (url, requests) = stub_openai_server().await;
+        let client = stub_client(&url);
+
+        // Longest first: the failing text and the next 255 form the first
+        // chunk, the remaining 45 the second.
+        let mut texts = vec!["fail: the longest text in the batch".to_string()];
+        texts.extend((0..300).map(|i| format!("text {:03}", i)));
+        let refs: Vec<&str> = texts.iter().map(String::as_str).collect();
+
+        let out = client.embed_batch(&refs).await.unwrap();
+        assert_eq!(requests.load(Ordering::SeqCst), 2);
+        assert!(out[..EMBED_BATCH_SIZE].iter().all(Option::is_none));
+        for (text, vec) in refs.iter().zip(&out).skip(EMBED_BATCH_SIZE) {
+            assert_eq!(vec.as_deref().map(stub_text).as_deref(), Some(*text));
+        }
+    }
+
+    #[tokio::test]
+    async fn embed_batch_errs_when_every_chunk_fails() {
+        let (url, _) = stub_openai_server().await;
+        let client = stub_client(&url);
+        assert!(client.embed_batch(&["fail", "other"]).await.is_err());
+        // Nothing to send is not a failure.
+        assert_eq!(
+            client.embed_batch(&["", " "]).await.unwrap(),
+            vec![None, None]
+        );
+    }
+
+    #[tokio::test]
+    async fn embed_near_reuses_vector_similar_to_probe() {
+        let (url, requests) = stub_openai_server().await;
+        let client = EmbeddingClient::new(&MemoryConfig {
+            embedding_provider: EmbeddingProvider::Provider,
+            embedding_cache_capacity: 0,
+            embedding_disk_cache_capacity: 0,
+            semantic_cache_threshold: Some(0.99),
+            ..Default::default()
+        })
+        .with_openai_fallback(fallback(&url));
+        let space = client.primary_space().id;
+        let probe = |text: &str| -> Vec<f32> { text.bytes().map(f32::from).collect() };
+
+        // Without a probe nothing is indexed.
+        client.embed("near one").await.unwrap();
+        assert!(embedding_cache::SEMANTIC_INDEX.lock().get(&space).is_none());
+
+        // The first probe misses, embeds, and starts the index.
+        let vec = client
+            .embed_near("near two", Some(&probe("near one")))
+            .await
+            .unwrap();
+        assert_eq!(stub_text(&vec), "near two");
+        assert_eq!(requests.load(Ordering::SeqCst), 2);
+
+        // A probe close to "near two" reuses its vector without a request.
+        let vec = client
+            .embed_near("near three", Some(&probe("near twp")))
+            .await
+            .unwrap();
+        assert_eq!(stub_text(&vec), "near two");
+        assert_eq!(requests.load(Ordering::SeqCst), 2);
+    }
+
+    #[tokio::test]
+    async fn blank_text_is_rejected_without_a_request() {
+        // Unroutable base URL: reaching the network would fail differently.
+        let client = EmbeddingClient::new(&MemoryConfig {
+            embedding_base_url: "http://192.0.2.1:9".into(),
+            ..Default::default()
+        });
+        let err = client.embed(" \n\t ").await.unwrap_err();
+        assert!(err.to_string().contains("blank"), "{}", err);
+    }
+
+    #[test]
+    fn error_markers_classify_route_failures() {
+        let missing = EngineError::from("Ollama embed 404 Not Found — model not found");
+        assert!(error_mentions(&missing, MODEL_MISSING_MARKERS));
+        assert!(!error_mentions(&missing, EMBED_UNSUPPORTED_MARKERS));
+
+        let unsupported = EngineError::from("OpenAI provider 400 — OperationNotSupported");
+        assert!(error_mentions(&unsupported, EMBED_UNSUPPORTED_MARKERS));
+    }
+
+    #[test]
+    fn reasoning_chat_models_keep_default_temperature() {
+        assert!(chat_model_fixed_temperature("o3-mini"));
+        assert!(chat_model_fixed_temperature("GPT-5.1"));
+        assert!(!chat_model_fixed_temperature("gpt-4.1-mini"));
+    }
+
+    #[test]
+    fn retry_delay_stays_within_the_embed_budget() {
+        for attempt in 0..EMBED_MAX_RETRIES {
+            for _ in 0..50 {
+                let delay = embed_retry_delay(attempt, None).unwrap();
+                assert!(delay <= EMBED_MAX_RETRY_DELAY);
+            }
+        }
+        assert_eq!(embed_retry_delay(0, Some(1)), Some(Duration::from_secs(1)));
+        assert_eq!(embed_retry_delay(0, Some(60)), None);
+    }
+
+    #[test]
+    fn input_json_single_is_plain_string() {
+        assert_eq!(input_json(&["hi"]), json!("hi"));
+        assert_eq!(input_json(&["a", "b"]), json!(["a", "b"]));
+    }
+
+    fn openai_response(body: Value) -> OpenAiEmbeddingResponse {
+        serde_json::from_value(body).unwrap()
+    }
+
+    #[test]
+    fn order_openai_data_orders_by_index() {
+        let resp = openai_response(json!({
+            "data": [
+                { "index": 1, "embedding": [0.0, 1.0] },
+                { "index": 0, "embedding": [1.0, 0.0] },
+            ]
+        }));
+        let vecs = order_openai_data(resp, 2, "test").unwrap();
+        assert_eq!(vecs, vec![vec![1.0, 0.0], vec![0.0, 1.0]]);
+    }
+
+    #[test]
+    fn order_openai_data_rejects_count_mismatch() {
+        let resp = openai_response(json!({ "data": [{ "index": 0, "embedding": [1.0] }] }));
+        assert!(order_openai_data(resp, 2, "test").is_err());
+    }
+
+    #[test]
+    fn ollama_response_accepts_both_shapes() {
+        let new: OllamaEmbedResponse =
+            serde_json::from_str(r#"{"embeddings":[[0.5,0.25]]}"#).unwrap();
+        assert_eq!(new.embeddings, vec![vec![0.5, 0.25]]);
+        let legacy: OllamaEmbedResponse = serde_json::from_str(r#"{"embedding":[0.5]}"#).unwrap();
+        assert_eq!(legacy.embedding, vec![0.5]);
+    }
+
+    #[test]
+    fn group_unique_texts_dedupes_and_skips_blank() {
+        let (unique, positions) = group_unique_texts(&["a", " ", "b", "a", "", "b", "a"]);
+        assert_eq!(unique, vec!["a", "b"]);
+        assert_eq!(positions, vec![vec![0, 3, 6], vec![2, 5]]);
+    }
+
+    #[test]
+    fn pack_batches_respects_item_and_token_limits() {
+        let pending: Vec<usize> = (0..10).collect();
+        let sizes = [90, 60, 50, 40, 10, 10, 10, 10, 10, 10];
+        let batches = pack_batches(&pending, |u| sizes[u], 4, 100);
+        assert_eq!(
+            batches,
+            vec![
+                &[0][..],
+                &[1][..],
+                &[2, 3, 4][..],
+                &[5, 6, 7, 8][..],
+                &[9][..]
+            ]
+        );
+
+        // An oversized entry still gets sent, alone.
+        let batches = pack_batches(&pending[..2], |_| 500, 4, 100);
+        assert_eq!(batches, vec![&[0][..], &[1][..]]);
+        assert!(pack_batches(&[], |_| 1, 4, 100).is_empty());
+    }
+
+    #[test]
+    fn fan_out_fills_every_position() {
+        let mut out = vec![None; 4];
+        fan_out(&mut out, &[0, 2], vec![1.0]);
+        assert_eq!(out, vec![Some(vec![1.0]), None, Some(vec![1.0]), None]);
+    }
+
+    #[test]
+    fn truncation_respects_char_boundaries() {
+        let tok = Tokenizer::new(TokenizerType::SentencePiece);
+        let text = "—".repeat(3000);
+        let safe = truncate_for_embedding(&tok, &text, 256);
+        assert!(!safe.is_empty() && safe.len() < text.len());
+        assert!(text.starts_with(safe));
+        assert!(estimate_embedding_tokens(&tok, safe) <= 256);
+    }
+
+    #[test]
+    fn truncation_budgets_dense_text_by_punctuation() {
+        let tok = Tokenizer::new(TokenizerType::Cl100kBase);
+        let prose = "the quick brown fox jumps over the lazy dog ".repeat(200);
+        assert_eq!(truncate_for_embedding(&tok, &prose, 8191), prose);
+
+        // ~2 chars/token JSON would overflow on a chars-per-token estimate alone.
+        let json = r#"{"a":[1,2],"b":{"c":3}}"#.repeat(2000);
+        let safe = truncate_for_embedding(&tok, &json, 8191);
+        assert!(safe.len() < json.len());
+        assert!(estimate_embedding_tokens(&tok, safe) <= 8191);
+        assert!(estimate_embedding_tokens(&tok, safe) > 7000);
+
+        // CJK: ~1+ token per char and no whitespace to count words by.
+        let cjk = "記憶を保存する".repeat(3000);
+        let safe = truncate_for_embedding(&tok, &cjk, 8191);
+        assert!(safe.chars().count() <= 8191);
+        assert!(safe.chars().count() > 7000);
+    }
+
+    #[test]
+    fn token_budget_uses_the_smallest_routed_model() {
+        assert_eq!(embedding_token_budget("text-embedding-3-small"), 8191);
+        assert_eq!(embedding_token_budget("mxbai-embed-large:latest"), 512);
+        assert_eq!(
+            embedding_token_budget("some-new-model"),
+            DEFAULT_EMBED_TOKEN_BUDGET
+        );
+
+        let client = EmbeddingClient::new(&MemoryConfig::default())
+            .with_openai_fallback(fallback("https://api.openai.com/v1"));
+        assert_eq!(
+            client.token_budget,
+            8191.min(embedding_token_budget("nomic-embed-text"))
+        );
+    }
+}
@@ -0,0 +1,435 @@
+// Paw Agent Engine — Embedding Cache
+//
+// Process-wide LRU of embedding vectors keyed by (namespace, sha256(text)).
+// The namespace identifies the vector space (endpoint + model) of the backend
+// that actually produced the vector, so vectors from different models — say
+// a fallback provider answering during an Ollama outage — never collide.
+//
+// Embedding the same text twice is common — re-indexing tools, recalling
+// with a repeated query, test_connection() — and each miss costs a network
+// round-trip (plus tokens on paid providers).  A hit is a hash lookup.
+//
+// A second, opt-in layer (`SemanticIndex`) answers near-duplicates: when the
+// caller already holds a probe vector, the most similar recent embedding is
+// reused if its cosine similarity clears `semantic_cache_threshold`.  A
+// vector space's index is only filled after its first probe, so enabling
+// the threshold costs nothing for callers that never pass one.
+//
+// Both layers hold vectors as `Arc<[f32]>`: exactly 4 bytes per dimension
+// (no spare `Vec` capacity left over from JSON decoding), and a vector
+// remembered by both layers is stored once.
+
+use parking_lot::Mutex;
+use sha2::{Digest, Sha256};
+use std::collections::{BTreeMap, HashMap};
+use std::sync::atomic::{AtomicU64, Ordering};
+use std::sync::{Arc, LazyLock};
+
+/// Cache key: (vector-space namespace id, SHA-256 of the embedded text).
+/// `Copy`, so lookups never allocate.
+pub(crate) type CacheKey = (u64, [u8; 32]);
+
+/// Compact id for a vector-space namespace, computed once per client.
+pub(crate) fn namespace_id(namespace: &str) -> u64 {
+    let digest = Sha256::digest(namespace.as_bytes());
+    u64::from_le_bytes(digest[..8].try_into().expect("SHA-256 is 32 bytes"))
+}
+
+/// SHA-256 of the embedded text — the per-namespace part of a cache key.
+pub(crate) fn text_hash(text: &str) -> [u8; 32] {
+    Sha256::digest(text.as_bytes()).into()
+}
+
+/// Bounded least-recently-used map from `CacheKey` to embedding vector.
+///
+/// Recency is tracked with a monotonically increasing tick; `order` maps
+/// tick → key so the oldest entry is always `order.first_key_value()`.
+/// All operations are O(log n).
+pub(crate) struct EmbeddingLru {
+    entries: HashMap<CacheKey, (Arc<[f32]>, u64)>,
+    order: BTreeMap<u64, CacheKey>,
+    tick: u64,
+}
+
+impl EmbeddingLru {
+    pub(crate) fn new() -> Self {
+        EmbeddingLru {
+            entries: HashMap::new(),
+            order: BTreeMap::new(),
+            tick: 0,
+        }
+    }
+
+    /// Look up a vector, marking it as most recently used.
+    pub(crate) fn get(&mut self, key: &CacheKey) -> Option<Vec<f32>> {
+        self.tick += 1;
+        let tick = self.tick;
+        let (vec, last_used) = self.entries.get_mut(key)?;
+        if let Some(k) = self.order.remove(last_used) {
+            self.order.insert(tick, k);
+        }
+        *last_used = tick;
+        Some(vec.to_vec())
+    }
+
+    /// Insert a vector, evicting least-recently-used entries until the
+    /// cache holds at most `capacity` items.  A capacity of 0 disables caching.
+    pub(crate) fn insert(&mut self, key: CacheKey, vec: Arc<[f32]>, capacity: usize) {
+        if capacity == 0 {
+            return;
+        }
+        self.tick += 1;
+        let tick = self.tick;
+        if let Some((_, old_tick)) = self.entries.insert(key, (vec, tick)) {
+            self.order.remove(&old_tick);
+        }
+        self.order.insert(tick, key);
+
+        while self.entries.len() > capacity {
+            match self.order.pop_first() {
+                Some((_, oldest)) => {
+                    self.entries.remove(&oldest);
+                }
+                None => break,
+            }
+        }
+    }
+
+    pub(crate) fn len(&self) -> usize {
+        self.entries.len()
+    }
+
+    pub(crate) fn clear(&mut self) {
+        self.entries.clear();
+        self.order.clear();
+    }
+
+    /// Remove every entry whose text hash is in `hashes`, in any namespace.
+    pub(crate) fn remove_hashes(&mut self, hashes: &[[u8; 32]]) {
+        let order = &mut self.order;
+        self.entries.retain(|key, (_, tick)| {
+            let keep = !hashes.contains(&key.1);
+            if !keep {
+                order.remove(tick);
+            }
+            keep
+        });
+    }
+}
+
+// ── Semantic (near-duplicate) index ────────────────────────────────────
+
+/// Max vectors kept per namespace in the semantic index.
+pub(crate) const SEMANTIC_INDEX_CAPACITY: usize = 4096;
+
+/// Fixed-size ring of recent embeddings for nearest-neighbour reuse.
+///
+/// Unit-normalised copies live in one contiguous row-major matrix so a
+/// lookup is a single linear pass of dot products; the original vectors are
+/// kept alongside and returned on a hit.  Eviction is FIFO: new rows
+/// overwrite the oldest slot, so nothing is ever shifted or rebuilt.
+pub(crate) struct SemanticIndex {
+    dims: usize,
+    capacity: usize,
+    /// `capacity × dims` normalised rows (only the first `len` are valid).
+    normalized: Vec<f32>,
+    originals: Vec<Arc<[f32]>>,
+    /// Text hash of each row, so erased text can be forgotten.
+    hashes: Vec<[u8; 32]>,
+    /// Next slot to overwrite once the ring is full.
+    next: usize,
+}
+
+impl SemanticIndex {
+    pub(crate) fn new(capacity: usize) -> Self {
+        SemanticIndex {
+            dims: 0,
+            capacity,
+            normalized: Vec::new(),
+            originals: Vec::new(),
+            hashes: Vec::new(),
+            next: 0,
+        }
+    }
+
+    pub(crate) fn len(&self) -> usize {
+        self.originals.len()
+    }
+
+    /// Add a vector.  A dimension change (model switch) resets the index.
+    pub(crate) fn insert(&mut self, hash: [u8; 32], vec: Arc<[f32]>) {
+        if vec.is_empty() || self.capacity == 0 {
+            return;
+        }
+        if vec.len() != self.dims {
+            *self = SemanticIndex::new(self.capacity);
+            self.dims = vec.len();
+        }
+        let Some(unit) = normalize(&vec) else {
+            return;
+        };
+
+        if self.originals.len() < self.capacity {
+            self.normalized.extend_from_slice(&unit);
+            self.originals.push(vec);
+            self.hashes.push(hash);
+        } else {
+            let row = self.next * self.dims;
+            self.normalized[row..row + self.dims].copy_from_slice(&unit);
+            self.originals[self.next] = vec;
+            self.hashes[self.next] = hash;
+            self.next = (self.next + 1) % self.capacity;
+        }
+    }
+
+    /// Return the stored vector most similar to `probe`, if its cosine
+    /// similarity exceeds `threshold`.
+    pub(crate) fn nearest(&self, probe: &[f32], threshold: f64) -> Option<Vec<f32>> {
+        if probe.len() != self.dims || self.originals.is_empty() {
+            return None;
+        }
+        let unit = normalize(probe)?;
+
+        let mut best = (usize::MAX, f64::MIN);
+        for (i, row) in self.normalized.chunks_exact(self.dims).enumerate() {
+            if self.originals[i].is_empty() {
+                continue; // forgotten
+            }
+            let dot: f32 = row.iter().zip(&unit).map(|(a, b)| a * b).sum();
+            if dot as f64 > best.1 {
+                best = (i, dot as f64);
+            }
+        }
+        (best.1 > threshold).then(|| self.originals[best.0].to_vec())
+    }
+
+    /// Blank out rows whose text hash is in `hashes`.  The slots stay in
+    /// the ring and are reused as it wraps.
+    pub(crate) fn forget(&mut self, hashes: &[[u8; 32]]) {
+        for i in 0..self.originals.len() {
+            if hashes.contains(&self.hashes[i]) {
+                let row = i * self.dims;
+                self.normalized[row..row + self.dims].fill(0.0);
+                self.originals[i] = Arc::from([]);
+            }
+        }
+    }
+}
+
+/// Scale a vector to unit length.  Returns `None` for a zero vector.
+fn normalize(vec: &[f32]) -> Option<Vec<f32>> {
+    let norm = vec.iter().map(|x| x * x).sum::<f32>().sqrt();
+    if norm < 1e-12 {
+        return None;
+    }
+    Some(vec.iter().map(|x| x / norm).collect())
+}
+
+// ── Process-wide cache ─────────────────────────────────────────────────
+
+pub(crate) static EMBED_CACHE: LazyLock<Mutex<EmbeddingLru>> =
+    LazyLock::new(|| Mutex::new(EmbeddingLru::new()));
+
+pub(crate) static SEMANTIC_INDEX: LazyLock<Mutex<HashMap<u64, SemanticIndex>>> =
+    LazyLock::new(|| Mutex::new(HashMap::new()));
+
+static CACHE_HITS: AtomicU64 = AtomicU64::new(0);
+static CACHE_MISSES: AtomicU64 = AtomicU64::new(0);
+
+/// Hit/miss counters for the embedding cache.
+#[derive(Debug, Clone, Copy, PartialEq, Eq)]
+pub struct EmbeddingCacheStats {
+    pub hits: u64,
+    pub misses: u64,
+    pub entries: usize,
+}
+
+/// Look up `key` in the process-wide cache, updating hit/miss counters.
+pub(crate) fn lookup(key: &CacheKey) -> Option<Vec<f32>> {
+    let found = EMBED_CACHE.lock().get(key);
+    if found.is_some() {
+        CACHE_HITS.fetch_add(1, Ordering::Relaxed);
+    } else {
+        CACHE_MISSES.fetch_add(1, Ordering::Relaxed);
+    }
+    found
+}
+
+/// Store a freshly computed vector in the process-wide cache.
+pub(crate) fn store(key: CacheKey, vec: Arc<[f32]>, capacity: usize) {
+    EMBED_CACHE.lock().insert(key, vec, capacity);
+}
+
+/// Find a near-duplicate of `probe` among recent vectors in `namespace`.
+/// The first probe creates the namespace's index, so vectors are only
+/// collected once someone is actually asking for near-duplicates.
+pub(crate) fn lookup_similar(namespace: u64, probe: &[f32], threshold: f64) -> Option<Vec<f32>> {
+    SEMANTIC_INDEX
+        .lock()
+        .entry(namespace)
+        .or_insert_with(|| SemanticIndex::new(SEMANTIC_INDEX_CAPACITY))
+        .nearest(probe, threshold)
+}
+
+/// Record a freshly computed vector in the semantic index for `namespace`,
+/// if that namespace has been probed (see `lookup_similar`).
+pub(crate) fn remember_similar(namespace: u64, hash: [u8; 32], vec: Arc<[f32]>) {
+    if let Some(index) = SEMANTIC_INDEX.lock().get_mut(&namespace) {
+        index.insert(hash, vec);
+    }
+}
+
+/// Snapshot of the process-wide cache counters.
+pub fn embedding_cache_stats() -> EmbeddingCacheStats {
+    EmbeddingCacheStats {
+        hits: CACHE_HITS.load(Ordering::Relaxed),
+        misses: CACHE_MISSES.load(Ordering::Relaxed),
+        entries: EMBED_CACHE.lock().len(),
+    }
+}
+
+/// Drop every cached vector of `texts`, in memory and on disk, in every
+/// vector space.  Called when memories are securely erased: a cached vector
+/// of erased text would otherwise outlive it.
+pub fn forget_embedded_texts(texts: &[&str]) {
+    let hashes: Vec<[u8; 32]> = texts
+        .iter()
+        .flat_map(|text| super::embedding::cache_key_hashes(text))
+        .collect();
+    if hashes.is_empty() {
+        return;
+    }
+    EMBED_CACHE.lock().remove_hashes(&hashes);
+    for index in SEMANTIC_INDEX.lock().values_mut() {
+        index.forget(&hashes);
+    }
+    super::embedding_disk_cache::forget(&hashes);
+}
+
+/// Drop every cached vector, in memory and on disk (e.g. after the user
+/// switches embedding model, or for a GDPR purge).
+pub fn clear_embedding_cache() {
+    EMBED_CACHE.lock().clear();
+    SEMANTIC_INDEX.lock().clear();
+    super::embedding_disk_cache::clear();
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    fn cache_key(namespace: &str, text: &str) -> CacheKey {
+        (namespace_id(namespace), text_hash(text))
+    }
+
+    #[test]
+    fn get_returns_inserted_vector() {
+        let mut lru = EmbeddingLru::new();
+        let key = cache_key("ns", "hello");
+        lru.insert(key, vec![1.0, 2.0].into(), 4);
+        assert_eq!(lru.get(&key), Some(vec![1.0, 2.0]));
+    }
+
+    #[test]
+    fn evicts_least_recently_used() {
+        let mut lru = EmbeddingLru::new();
+        let a = cache_key("ns", "a");
+        let b = cache_key("ns", "b");
+        let c = cache_key("ns", "c");
+        lru.insert(a, vec![1.0].into(), 2);
+        lru.insert(b, vec![2.0].into(), 2);
+        // Touch `a` so `b` becomes the eviction candidate
+        assert!(lru.get(&a).is_some());
+        lru.insert(c, vec![3.0].into(), 2);
+        assert_eq!(lru.len(), 2);
+        assert!(lru.get(&a).is_some());
+        assert!(lru.get(&b).is_none());
+        assert!(lru.get(&c).is_some());
+    }
+
+    #[test]
+    fn reinsert_replaces_without_growing() {
+        let mut lru = EmbeddingLru::new();
+        let key = cache_key("ns", "x");
+        lru.insert(key, vec![1.0].into(), 4);
+        lru.insert(key, vec![9.0].into(), 4);
+        assert_eq!(lru.len(), 1);
+        assert_eq!(lru.get(&key), Some(vec![9.0]));
+    }
+
+    #[test]
+    fn zero_capacity_disables_cache() {
+        let mut lru = EmbeddingLru::new();
+        let key = cache_key("ns", "x");
+        lru.insert(key, vec![1.0].into(), 0);
+        assert_eq!(lru.len(), 0);
+        assert!(lru.get(&key).is_none());
+    }
+
+    #[test]
+    fn remove_hashes_drops_text_in_every_namespace() {
+        let mut lru = EmbeddingLru::new();
+        lru.insert(cache_key("a", "secret"), vec![1.0].into(), 8);
+        lru.insert(cache_key("b", "secret"), vec![2.0].into(), 8);
+        lru.insert(cache_key("a", "kept"), vec![3.0].into(), 8);
+        lru.remove_hashes(&[text_hash("secret")]);
+        assert_eq!(lru.len(), 1);
+        assert!(lru.get(&cache_key("a", "secret")).is_none());
+        assert!(lru.get(&cache_key("b", "secret")).is_none());
+        assert_eq!(lru.get(&cache_key("a", "kept")), Some(vec![3.0]));
+        // eviction order stays consistent with the remaining entries
+        lru.insert(cache_key("a", "new"), vec![4.0].into(), 1);
+        assert_eq!(lru.len(), 1);
+        assert_eq!(lru.get(&cache_key("a", "new")), Some(vec![4.0]));
+    }
+
+    #[test]
+    fn semantic_index_forgets_hashes() {
+        let mut index = SemanticIndex::new(4);
+        index.insert([8; 32], Arc::from([1.0, 0.0]));
+        index.insert([9; 32], Arc::from([0.0, 1.0]));
+        index.forget(&[[8; 32]]);
+        assert!(index.nearest(&[1.0, 0.0], 0.5).is_none());
+        assert_eq!(index.nearest(&[0.0, 1.0], 0.5), Some(vec![0.0, 1.0]));
+    }
+
+    #[test]
+    fn semantic_index_returns_near_duplicate() {
+        let mut index = SemanticIndex::new(8);
+        index.insert([1; 32], Arc::from([1.0, 0.0, 0.0]));
+        index.insert([2; 32], Arc::from([0.0, 1.0, 0.0]));
+        let hit = index.nearest(&[0.99, 0.05, 0.0], 0.92);
+        assert_eq!(hit, Some(vec![1.0, 0.0, 0.0]));
+        assert!(index.nearest(&[0.6, 0.6, 0.5], 0.92).is_none());
+    }
+
+    #[test]
+    fn semantic_index_evicts_fifo() {
+        let mut index = SemanticIndex::new(2);
+        index.insert([3; 32], Arc::from([1.0, 0.0]));
+        index.insert([4; 32], Arc::from([0.0, 1.0]));
+        index.insert([5; 32], Arc::from([-1.0, 0.0]));
+        assert_eq!(index.len(), 2);
+        // [1, 0] was the oldest and has been overwritten
+        assert_eq!(index.nearest(&[1.0, 0.0], 0.9), None);
+        assert_eq!(index.nearest(&[-1.0, 0.0], 0.9), Some(vec![-1.0, 0.0]));
+    }
+
+    #[test]
+    fn semantic_index_resets_on_dimension_change() {
+        let mut index = SemanticIndex::new(4);
+        index.insert([6; 32], Arc::from([1.0, 0.0]));
+        index.insert([7; 32], Arc::from([1.0, 0.0, 0.0]));
+        assert_eq!(index.len(), 1);
+        assert!(index.nearest(&[1.0, 0.0], 0.5).is_none());
+    }
+
+    #[test]
+    fn namespace_separates_models() {
+        assert_ne!(
+            cache_key("ollama|nomic", "x"),
+            cache_key("openai|3-small", "x")
+        );
+        assert_eq!(cache_key("ns", "x"), cache_key("ns", "x"));
+    }
+}
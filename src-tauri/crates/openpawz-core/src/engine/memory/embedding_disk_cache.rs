@@ -0,0 +1,351 @@
+// Paw Agent Engine — Persistent Embedding Cache
+//
+// SQLite-backed tier behind the in-memory LRU in embedding_cache.rs.  The
+// desktop app restarts often and would otherwise re-embed the same memories,
+// queries and tool descriptions on every launch; a file under the data root
+// survives restarts and, in WAL mode, is safely shared by concurrent
+// processes.
+//
+// Rows use the same key as the LRU — (vector space, sha256(text)), where the
+// space is the endpoint + model that actually produced the vector — so
+// vectors from different models never collide.  Once the table outgrows its
+// capacity the oldest-written rows are evicted.
+//
+// Vectors can be inverted and text hashes confirm known text, so the file
+// is treated like the memory store: `secure_delete` zeroes freed pages,
+// secure erase drops the erased text's rows (`forget_embedded_texts`) and
+// a GDPR purge clears the file (`clear_embedding_cache`).
+
+use crate::atoms::error::EngineResult;
+use crate::engine::paths::embedding_cache_db_path;
+use crate::engine::sessions::embedding::{bytes_to_f32_vec, f32_vec_to_bytes};
+use log::warn;
+use parking_lot::Mutex;
+use rusqlite::{params, Connection, OptionalExtension};
+use std::path::Path;
+use std::time::{Duration, SystemTime, UNIX_EPOCH};
+
+const SCHEMA: &str = "
+    CREATE TABLE IF NOT EXISTS emb (
+        model TEXT NOT NULL,
+        hash  BLOB NOT NULL,
+        dim   INTEGER NOT NULL,
+        vec   BLOB NOT NULL,
+        ts    INTEGER NOT NULL,
+        PRIMARY KEY (model, hash)
+    );
+    CREATE INDEX IF NOT EXISTS idx_emb_ts ON emb(ts);
+    CREATE INDEX IF NOT EXISTS idx_emb_hash ON emb(hash);
+";
+
+/// Stored in `PRAGMA user_version`.  Version 0 keyed rows by the whole
+/// route, so some hold a fallback provider's vectors under the primary
+/// model's key; those rows are dropped on upgrade.
+const SCHEMA_VERSION: i64 = 1;
+
+/// Rows written between capacity checks.  `COUNT(*)` is a table scan, so
+/// eviction runs in batches rather than after every insert.
+const EVICT_CHECK_INTERVAL: usize = 512;
+
+/// A handle to one embedding cache database.
+pub(crate) struct DiskCache {
+    conn: Connection,
+    writes_since_check: usize,
+}
+
+impl DiskCache {
+    /// Open (or create) the cache database at `path`.
+    pub(crate) fn open(path: &Path) -> EngineResult<Self> {
+        let conn = Connection::open(path)?;
+        conn.execute_batch(
+            "PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL; PRAGMA secure_delete=ON;",
+        )?;
+        // Another process may hold the write lock briefly.
+        conn.busy_timeout(Duration::from_millis(2000))?;
+        Self::from_connection(conn)
+    }
+
+    fn from_connection(conn: Connection) -> EngineResult<Self> {
+        conn.execute_batch(SCHEMA)?;
+        let version: i64 = conn.query_row("PRAGMA user_version", [], |r| r.get(0))?;
+        if version < SCHEMA_VERSION {
+            conn.execute("DELETE FROM emb", [])?;
+            conn.pragma_update(None, "user_version", SCHEMA_VERSION)?;
+        }
+        Ok(DiskCache {
+            conn,
+            // Check on the first write: another process may have filled it.
+            writes_since_check: EVICT_CHECK_INTERVAL,
+        })
+    }
+
+    /// Fetch the vectors stored for `hashes` in `namespace`, aligned with
+    /// `hashes`.  Rows whose blob doesn't match their dimension are skipped.
+    pub(crate) fn get_many(
+        &self,
+        namespace: &str,
+        hashes: &[[u8; 32]],
+    ) -> EngineResult<Vec<Option<Vec<f32>>>> {
+        let mut stmt = self
+            .conn
+            .prepare_cached("SELECT dim, vec FROM emb WHERE model = ?1 AND hash = ?2")?;
+        let mut found = Vec::with_capacity(hashes.len());
+        for hash in hashes {
+            let row: Option<(i64, Vec<u8>)> = stmt
+                .query_row(params![namespace, &hash[..]], |r| {
+                    Ok((r.get(0)?, r.get(1)?))
+                })
+                .optional()?;
+            found.push(
+                row.filter(|(dim, bytes)| bytes.len() as i64 == dim * 4)
+                    .map(|(_, bytes)| bytes_to_f32_vec(&bytes)),
+            );
+        }
+        Ok(found)
+    }
+
+    /// Store vectors in one transaction, then evict down to `capacity`
+    /// if a check is due.
+    pub(crate) fn put_many(
+        &mut self,
+        namespace: &str,
+        entries: &[([u8; 32], &[f32])],
+        capacity: usize,
+    ) -> EngineResult<()> {
+        let now = SystemTime::now()
+            .duration_since(UNIX_EPOCH)
+            .unwrap_or_default()
+            .as_secs() as i64;
+        let tx = self.conn.transaction()?;
+        {
+            let mut stmt = tx.prepare_cached(
+                "INSERT OR REPLACE INTO emb (model, hash, dim, vec, ts)
+                 VALUES (?1, ?2, ?3, ?4, ?5)",
+            )?;
+            for (hash, vec) in entries {
+                stmt.execute(params![
+                    namespace,
+                    &hash[..],
+                    vec.len() as i64,
+                    f32_vec_to_bytes(vec),
+                    now
+                ])?;
+            }
+        }
+        tx.commit()?;
+
+        self.writes_since_check += entries.len();
+        if self.writes_since_check >= EVICT_CHECK_INTERVAL {
+            self.evict(capacity)?;
+        }
+        Ok(())
+    }
+
+    /// Delete the oldest rows until at most `capacity` remain.
+    /// Returns the number of rows removed.
+    pub(crate) fn evict(&mut self, capacity: usize) -> EngineResult<usize> {
+        self.writes_since_check = 0;
+        let count: i64 = self
+            .conn
+            .query_row("SELECT COUNT(*) FROM emb", [], |r| r.get(0))?;
+        let excess = count - capacity as i64;
+        if excess <= 0 {
+            return Ok(0);
+        }
+        let removed = self.conn.execute(
+            "DELETE FROM emb WHERE rowid IN
+                (SELECT rowid FROM emb ORDER BY ts, rowid LIMIT ?1)",
+            params![excess],
+        )?;
+        Ok(removed)
+    }
+
+    /// Remove every row, then checkpoint so no copy of the old pages
+    /// remains in the WAL.
+    pub(crate) fn clear(&self) -> EngineResult<()> {
+        if self.conn.execute("DELETE FROM emb", [])? > 0 {
+            self.truncate_wal()?;
+        }
+        Ok(())
+    }
+
+    /// Remove the rows for `hashes` in every namespace.  Returns the number
+    /// of rows removed.
+    pub(crate) fn forget(&mut self, hashes: &[[u8; 32]]) -> EngineResult<usize> {
+        let tx = self.conn.transaction()?;
+        let mut removed = 0;
+        {
+            let mut stmt = tx.prepare_cached("DELETE FROM emb WHERE hash = ?1")?;
+            for hash in hashes {
+                removed += stmt.execute(params![&hash[..]])?;
+            }
+        }
+        tx.commit()?;
+        if removed > 0 {
+            self.truncate_wal()?;
+        }
+        Ok(removed)
+    }
+
+    fn truncate_wal(&self) -> EngineResult<()> {
+        self.conn
+            .execute_batch("PRAGMA wal_checkpoint(TRUNCATE);")?;
+        Ok(())
+    }
+}
+
+/// State of the process-wide cache database.
+enum Slot {
+    /// Not opened yet.
+    Closed,
+    Open(DiskCache),
+    /// Opening failed — callers simply skip the disk tier.
+    Unavailable,
+}
+
+/// The process-wide cache, opened on first use.
+static DISK_CACHE: Mutex<Slot> = Mutex::new(Slot::Closed);
+
+/// Run `f` on the process-wide cache, opening it if needed.  With
+/// `create == false` a database that doesn't exist yet is left uncreated
+/// (there is nothing in it to clear), so a disabled tier never makes a file.
+fn with_cache<R>(create: bool, f: impl FnOnce(&mut DiskCache) -> R) -> Option<R> {
+    let mut slot = DISK_CACHE.lock();
+    if let Slot::Closed = *slot {
+        let path = embedding_cache_db_path();
+        if !create && !path.exists() {
+            return None;
+        }
+        *slot = match DiskCache::open(&path) {
+            Ok(cache) => Slot::Open(cache),
+            Err(e) => {
+                warn!(
+                    "[memory] Persistent embedding cache unavailable at {:?}: {}",
+                    path, e
+                );
+                Slot::Unavailable
+            }
+        };
+    }
+    match &mut *slot {
+        Slot::Open(cache) => Some(f(cache)),
+        _ => None,
+    }
+}
+
+/// Look up `hashes` in the persistent cache.  Errors count as misses.
+pub(crate) fn lookup_many(namespace: &str, hashes: &[[u8; 32]]) -> Vec<Option<Vec<f32>>> {
+    with_cache(true, |cache| cache.get_many(namespace, hashes))
+        .and_then(|found| {
+            found
+                .map_err(|e| warn!("[memory] Persistent embedding cache read failed: {}", e))
+                .ok()
+        })
+        .unwrap_or_else(|| vec![None; hashes.len()])
+}
+
+/// Write freshly computed vectors to the persistent cache.
+pub(crate) fn store_many(namespace: &str, entries: &[([u8; 32], &[f32])], capacity: usize) {
+    if let Some(Err(e)) = with_cache(true, |cache| cache.put_many(namespace, entries, capacity)) {
+        warn!("[memory] Persistent embedding cache write failed: {}", e);
+    }
+}
+
+/// Drop the persisted vectors for `hashes`, in every namespace.
+pub(crate) fn forget(hashes: &[[u8; 32]]) {
+    if let Some(Err(e)) = with_cache(false, |cache| cache.forget(hashes)) {
+        warn!("[memory] Persistent embedding cache erase failed: {}", e);
+    }
+}
+
+/// Drop every persisted vector.
+pub(crate) fn clear() {
+    if let Some(Err(e)) = with_cache(false, |cache| cache.clear()) {
+        warn!("[memory] Persistent embedding cache clear failed: {}", e);
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    fn test_cache() -> DiskCache {
+        DiskCache::from_connection(Connection::open_in_memory().unwrap()).unwrap()
+    }
+
+    #[test]
+    fn round_trips_vectors_per_namespace() {
+        let mut cache = test_cache();
+        let (a, b) = ([1u8; 32], [2u8; 32]);
+        cache
+            .put_many("ns", &[(a, &[1.0, -2.5][..]), (b, &[0.5][..])], 10)
+            .unwrap();
+
+        let found = cache.get_many("ns", &[b, [9u8; 32], a]).unwrap();
+        assert_eq!(found, vec![Some(vec![0.5]), None, Some(vec![1.0, -2.5])]);
+        assert_eq!(cache.get_many("other", &[a]).unwrap(), vec![None]);
+    }
+
+    #[test]
+    fn evicts_oldest_rows_beyond_capacity() {
+        let mut cache = test_cache();
+        for i in 0..5u8 {
+            cache
+                .put_many("ns", &[([i; 32], &[i as f32][..])], 100)
+                .unwrap();
+        }
+        assert_eq!(cache.evict(3).unwrap(), 2);
+
+        let found = cache.get_many("ns", &[[0; 32], [1; 32], [4; 32]]).unwrap();
+        assert_eq!(found, vec![None, None, Some(vec![4.0])]);
+    }
+
+    #[test]
+    fn upgrade_drops_rows_keyed_by_route() {
+        let conn = Connection::open_in_memory().unwrap();
+        conn.execute_batch(SCHEMA).unwrap();
+        conn.execute(
+            "INSERT INTO emb (model, hash, dim, vec, ts) VALUES ('Auto|x|m||', ?1, 1, ?2, 0)",
+            params![&[3u8; 32][..], f32_vec_to_bytes(&[3.0])],
+        )
+        .unwrap();
+
+        let mut cache = DiskCache::from_connection(conn).unwrap();
+        assert_eq!(
+            cache.get_many("Auto|x|m||", &[[3; 32]]).unwrap(),
+            vec![None]
+        );
+
+        // Current-version rows survive a reopen.
+        cache.put_many("x|m", &[([4; 32], &[4.0][..])], 10).unwrap();
+        let cache = DiskCache::from_connection(cache.conn).unwrap();
+        assert_eq!(
+            cache.get_many("x|m", &[[4; 32]]).unwrap(),
+            vec![Some(vec![4.0])]
+        );
+    }
+
+    #[test]
+    fn forget_removes_hash_in_every_namespace() {
+        let mut cache = test_cache();
+        cache.put_many("a", &[([5; 32], &[5.0][..])], 10).unwrap();
+        cache
+            .put_many("b", &[([5; 32], &[5.0][..]), ([6; 32], &[6.0][..])], 10)
+            .unwrap();
+
+        assert_eq!(cache.forget(&[[5; 32]]).unwrap(), 2);
+        assert_eq!(cache.get_many("a", &[[5; 32]]).unwrap(), vec![None]);
+        assert_eq!(
+            cache.get_many("b", &[[5; 32], [6; 32]]).unwrap(),
+            vec![None, Some(vec![6.0])]
+        );
+    }
+
+    #[test]
+    fn clear_removes_everything() {
+        let mut cache = test_cache();
+        cache.put_many("ns", &[([7; 32], &[7.0][..])], 10).unwrap();
+        cache.clear().unwrap();
+        assert_eq!(cache.get_many("ns", &[[7; 32]]).unwrap(), vec![None]);
+    }
+}
@@ -7,19 +7,27 @@
 // Module layout:
 //   ollama.rs    — Ollama lifecycle (auto-start, model discovery/pull)
 //   embedding.rs — EmbeddingClient (Ollama + OpenAI-compatible API calls)
+//   embedding_cache.rs — in-process LRU of embedding vectors
+//   embedding_disk_cache.rs — SQLite cache of embedding vectors across restarts
 //   mod.rs       — store, search (hybrid BM25+vector), MMR, fact extraction
 
 pub mod embedding;
+pub mod embedding_cache;
+pub mod embedding_disk_cache;
 pub mod ollama;
 
 // Re-export public API at the module level
 pub use embedding::EmbeddingClient;
+pub use embedding_cache::{
+    clear_embedding_cache, embedding_cache_stats, forget_embedded_texts, EmbeddingCacheStats,
+};
 pub use ollama::{ensure_ollama_ready, is_ollama_init_done, OllamaReadyStatus};
 
 use crate::atoms::error::EngineResult;
 use crate::engine::sessions::{f32_vec_to_bytes, SessionStore};
 use crate::engine::types::*;
 use log::{error, info, warn};
+use std::collections::HashMap;
 
 // ── Store ──────────────────────────────────────────────────────────────
 
@@ -289,8 +297,6 @@ fn merge_search_results(
     bm25_weight: f64,
     vector_weight: f64,
 ) -> Vec<Memory> {
-    use std::collections::HashMap;
-
     let mut score_map: HashMap<String, (Option<f64>, Option<f64>, Memory)> = HashMap::new();
 
     // Normalize BM25 scores to [0,1]
@@ -426,34 +432,30 @@ pub async fn backfill_embeddings(
         "[memory] Backfill: embedding {} memories...",
         memories.len()
     );
+    let texts: Vec<&str> = memories.iter().map(|m| m.content.as_str()).collect();
+    let vectors = client.embed_batch(&texts).await.unwrap_or_else(|e| {
+        warn!("[memory] Backfill: embedding failed — {}", e);
+        vec![None; texts.len()]
+    });
+
     let mut success = 0usize;
     let mut fail = 0usize;
-
-    for mem in &memories {
-        match client.embed(&mem.content).await {
-            Ok(vec) => {
-                let bytes = f32_vec_to_bytes(&vec);
-                if let Err(e) = store.update_memory_embedding(&mem.id, &bytes) {
-                    warn!(
-                        "[memory] Backfill: failed to update {} — {}",
-                        &mem.id[..8],
-                        e
-                    );
-                    fail += 1;
-                } else {
-                    success += 1;
-                }
-            }
-            Err(e) => {
-                warn!(
-                    "[memory] Backfill: embed failed for {} — {}",
-                    &mem.id[..8],
-                    e
-                );
-                fail += 1;
-            }
+    for (mem, vec) in memories.iter().zip(vectors) {
+        let Some(vec) = vec else {
+            fail += 1;
+            continue;
+        };
+        let bytes = f32_vec_to_bytes(&vec);
+        if let Err(e) = store.update_memory_embedding(&mem.id, &bytes) {
+            warn!(
+                "[memory] Backfill: failed to update {} — {}",
+                &mem.id[..8],
+                e
+            );
+            fail += 1;
+        } else {
+            success += 1;
         }
-        tokio::time::sleep(std::time::Duration::from_millis(50)).await;
     }
 
     info!(
@@ -496,8 +498,6 @@ pub async fn extract_memorable_facts_llm(
     provider: &crate::engine::providers::AnyProvider,
     model: &str,
 ) -> Vec<(String, String)> {
-    use crate::engine::types::{Message, MessageContent, Role};
-
     // Skip trivially short exchanges — not worth an LLM call
     if user_message.len() < 10 && assistant_response.len() < 50 {
         return Vec::new();
@@ -732,8 +732,6 @@ pub async fn generate_session_summary(
     provider: &crate::engine::providers::AnyProvider,
     model: &str,
 ) -> String {
-    use crate::engine::types::{Message, MessageContent, Role};
-
     let user_trunc = if user_message.len() > 500 {
         format!(
             "{}…",
@@ -830,8 +828,6 @@ pub async fn compress_history(
     provider: &crate::engine::providers::AnyProvider,
     model: &str,
 ) -> Option<String> {
-    use crate::engine::types::{Message, MessageContent, Role};
-
     if messages_to_compress.is_empty() {
         return None;
     }
@@ -14,7 +14,7 @@ use reqwest::Client;
 use serde_json::{json, Value};
 use std::sync::atomic::{AtomicBool, Ordering};
 
-use super::embedding::EmbeddingClient;
+use super::embedding::{embedding_http_client, record_ollama_status, EmbeddingClient};
 
 /// Track whether we've already run ensure_ollama_ready this session.
 static OLLAMA_INIT_DONE: AtomicBool = AtomicBool::new(false);
@@ -39,7 +39,7 @@ pub struct OllamaReadyStatus {
 /// 4. If not, pulls it automatically
 /// 5. Does a test embedding to verify everything works
 pub async fn ensure_ollama_ready(config: &MemoryConfig) -> OllamaReadyStatus {
-    let client = Client::new();
+    let client = embedding_http_client();
     let base_url = config.embedding_base_url.trim_end_matches('/');
     let model = &config.embedding_model;
 
@@ -183,8 +183,9 @@ pub fn is_ollama_init_done() -> bool {
 }
 
 /// Check if Ollama is reachable by hitting the /api/tags endpoint.
+/// The result also refreshes the cached status `check_ollama_running` reads.
 async fn check_ollama_reachable(client: &Client, base_url: &str) -> bool {
-    match client
+    let reachable = match client
         .get(format!("{}/api/tags", base_url))
         .timeout(std::time::Duration::from_secs(3))
         .send()
@@ -192,7 +193,9 @@ async fn check_ollama_reachable(client: &Client, base_url: &str) -> bool {
     {
         Ok(resp) => resp.status().is_success(),
         Err(_) => false,
-    }
+    };
+    record_ollama_status(base_url, reachable);
+    reachable
 }
 
 /// Try to start Ollama by spawning `ollama serve` as a detached background process.
@@ -103,6 +103,13 @@ pub fn engine_db_path() -> PathBuf {
     dir.join("engine.db")
 }
 
+/// Persistent embedding cache: `{data_root}/embedding_cache.db`
+pub fn embedding_cache_db_path() -> PathBuf {
+    let dir = paw_data_dir();
+    std::fs::create_dir_all(&dir).ok();
+    dir.join("embedding_cache.db")
+}
+
 /// Per-agent workspace: `{data_root}/workspaces/{agent_id}/`
 pub fn agent_workspace_dir(agent_id: &str) -> PathBuf {
     paw_data_dir().join("workspaces").join(agent_id)
@@ -1582,12 +1582,21 @@ impl SessionStore {
     // applies to the B-tree layer. We belt-and-suspenders by overwriting
     // content fields with zeros before DELETE so even pre-secure_delete
     // SQLite builds are protected, and the WAL never contains the original
-    // plaintext in the same page as the DELETE marker.
+    // plaintext in the same page as the DELETE marker.  Cached embeddings
+    // of the erased text are evicted too; the cache is keyed by text, so the
+    // text is read before it is zeroed.
 
     /// Securely erase an episodic memory: zero all content fields, then delete.
     /// This prevents content recovery via SQLite page forensics or WAL replay.
     pub fn engram_secure_erase_episodic(&self, id: &str) -> EngineResult<()> {
         let conn = self.conn.lock();
+        let erased: Option<(String, String)> = conn
+            .query_row(
+                "SELECT content_full, agent_id FROM episodic_memories WHERE id = ?1",
+                params![id],
+                |row| Ok((row.get(0)?, row.get(1)?)),
+            )
+            .ok();
         // Phase 1: overwrite all content fields with empty/zero values
         conn.execute(
             "UPDATE episodic_memories SET
@@ -1603,12 +1612,28 @@ impl SessionStore {
             "DELETE FROM memory_edges WHERE source_id = ?1 OR target_id = ?1",
             params![id],
         )?;
+        drop(conn);
+
+        // Phase 3: evict cached embeddings (outside the store lock)
+        if let Some(text) =
+            erased.and_then(|(content, agent_id)| erased_plaintext(&content, &agent_id))
+        {
+            crate::engine::memory::forget_embedded_texts(&[&text]);
+        }
         Ok(())
     }
 
     /// Securely erase a semantic memory.
     pub fn engram_secure_erase_semantic(&self, id: &str) -> EngineResult<()> {
         let conn = self.conn.lock();
+        let erased: Option<(String, String, String, String)> = conn
+            .query_row(
+                "SELECT subject, predicate, object, scope_agent_id
+                 FROM semantic_memories WHERE id = ?1",
+                params![id],
+                |row| Ok((row.get(0)?, row.get(1)?, row.get(2)?, row.get(3)?)),
+            )
+            .ok();
         conn.execute(
             "UPDATE semantic_memories SET
                 subject = '', predicate = '', object = '',
@@ -1621,6 +1646,15 @@ impl SessionStore {
             "DELETE FROM memory_edges WHERE source_id = ?1 OR target_id = ?1",
             params![id],
         )?;
+        drop(conn);
+
+        // Triples are embedded as "subject predicate object"
+        if let Some((subject, predicate, object, agent_id)) = erased {
+            if let Some(object) = erased_plaintext(&object, &agent_id) {
+                let text = format!("{} {} {}", subject, predicate, object);
+                crate::engine::memory::forget_embedded_texts(&[&text]);
+            }
+        }
         Ok(())
     }
 
@@ -1649,6 +1683,21 @@ impl SessionStore {
     }
 }
 
+/// Plaintext of an erased field, for evicting its cached embeddings.
+/// Vectors are computed before encryption at rest, so encrypted content is
+/// decrypted with the owning agent's key.  `None` if that fails.
+fn erased_plaintext(stored: &str, agent_id: &str) -> Option<String> {
+    use crate::engine::engram::encryption::{
+        decrypt_memory_content, get_agent_encryption_key, is_encrypted,
+    };
+
+    if !is_encrypted(stored) {
+        return Some(stored.to_string());
+    }
+    let key = get_agent_encryption_key(agent_id).ok()?;
+    decrypt_memory_content(stored, &key).ok()
+}
+
 // ═════════════════════════════════════════════════════════════════════════════
 // Temporal Search Queries
 // ═════════════════════════════════════════════════════════════════════════════
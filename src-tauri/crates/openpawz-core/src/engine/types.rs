@@ -156,6 +156,10 @@ impl Default for MemoryConfig {
             auto_capture: true,
             recall_limit: 5,
             recall_threshold: 0.3,
+            embedding_cache_capacity: default_embedding_cache_capacity(),
+            semantic_cache_threshold: None,
+            embedding_max_concurrency: default_embedding_max_concurrency(),
+            embedding_disk_cache_capacity: default_embedding_disk_cache_capacity(),
         }
     }
 }
@@ -231,8 +235,9 @@ impl ModelRouting {
 
 // serde default helpers for EngineConfig live in crate::atoms::types
 use crate::atoms::types::{
-    default_context_window_tokens, default_daily_budget_usd, default_max_concurrent_runs,
-    default_user_timezone,
+    default_context_window_tokens, default_daily_budget_usd, default_embedding_cache_capacity,
+    default_embedding_disk_cache_capacity, default_embedding_max_concurrency,
+    default_max_concurrent_runs, default_user_timezone,
 };
 
 impl Default for EngineConfig {
@@ -79,6 +79,7 @@ pub fn engine_set_config(
     // Update in-memory config
     let mut cfg = state.config.lock();
     *cfg = config;
+    state.reload_embedding_client();
 
     info!(
         "[engine] Config updated, {} providers configured",
@@ -106,6 +107,7 @@ pub fn engine_upsert_provider(
     if cfg.default_provider.is_none() && !cfg.providers.is_empty() {
         cfg.default_provider = Some(cfg.providers[0].id.clone());
     }
+    state.reload_embedding_client();
 
     // Persist
     let json = serde_json::to_string(&*cfg).map_err(|e| format!("Serialize error: {}", e))?;
@@ -132,6 +134,7 @@ pub fn engine_remove_provider(
     if cfg.default_provider.as_deref() == Some(&provider_id) {
         cfg.default_provider = cfg.providers.first().map(|p| p.id.clone());
     }
+    state.reload_embedding_client();
 
     let json = serde_json::to_string(&*cfg).map_err(|e| format!("Serialize error: {}", e))?;
     state.store.set_config("engine_config", &json)?;
@@ -335,6 +338,7 @@ pub async fn engine_auto_setup(state: State<'_, EngineState>) -> Result<serde_js
         cfg.providers.push(provider);
         cfg.default_provider = Some("ollama".to_string());
         cfg.default_model = Some(model_name.clone());
+        state.reload_embedding_client();
 
         let json = serde_json::to_string(&*cfg).map_err(|e| format!("Serialize: {}", e))?;
         state.store.set_config("engine_config", &json)?;
@@ -257,6 +257,7 @@ pub fn engine_set_memory_config(
     state.store.set_config("memory_config", &json)?;
     let mut cfg = state.memory_config.lock();
     *cfg = config;
+    state.reload_embedding_client();
     info!("[engine] Memory config updated");
     Ok(())
 }
@@ -317,8 +318,8 @@ pub async fn engine_embedding_pull_model(state: State<'_, EngineState>) -> Resul
         .embedding_client()
         .ok_or_else(|| "No embedding configuration".to_string())?;
 
-    // Check Ollama running first
-    let running = client.check_ollama_running().await.unwrap_or(false);
+    // Check Ollama running first — fresh, since the user may have just started it
+    let running = client.check_ollama_running_fresh().await.unwrap_or(false);
     if !running {
         return Err("Ollama is not running. Start Ollama first, then try again.".into());
     }
@@ -389,6 +390,14 @@ pub async fn engine_memory_backfill(
     }))
 }
 
+/// Drop every cached embedding vector, in memory and in `embedding_cache.db`.
+#[tauri::command]
+pub fn engine_embedding_cache_clear() -> Result<(), String> {
+    memory::clear_embedding_cache();
+    info!("[memory] Embedding cache cleared");
+    Ok(())
+}
+
 /// Save working memory snapshot for an agent (called on agent switch).
 #[tauri::command]
 pub fn engine_working_memory_save(
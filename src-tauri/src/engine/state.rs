@@ -357,6 +357,12 @@ pub struct EngineState {
     /// HNSW vector index for approximate nearest-neighbor search on episodic
     /// memory embeddings. Built from DB on startup, updated incrementally.
     pub hnsw_index: crate::engine::engram::hnsw::SharedHnswIndex,
+    /// EmbeddingClient resolved from the current memory + provider config.
+    /// Built on first use and reused until `reload_embedding_client()`.
+    embedding_client_cache: Mutex<Option<EmbeddingClient>>,
+    /// Bumped by `reload_embedding_client()` so a build that raced a config
+    /// change is not cached.
+    embedding_client_generation: AtomicU64,
 }
 
 impl EngineState {
@@ -441,6 +447,8 @@ impl EngineState {
             yield_signals: Arc::new(Mutex::new(HashMap::new())),
             cognitive_states: Arc::new(Mutex::new(HashMap::new())),
             hnsw_index,
+            embedding_client_cache: Mutex::new(None),
+            embedding_client_generation: AtomicU64::new(0),
         })
     }
 
@@ -489,7 +497,34 @@ impl EngineState {
     /// Automatically adds a fallback to the user's configured OpenAI (or
     /// compatible) provider so embeddings and PII scans work even without
     /// a local Ollama instance.
+    ///
+    /// The client is resolved once and reused, so hot loops that embed many
+    /// chunks don't re-lock both configs and rebuild it per call.  Call
+    /// `reload_embedding_client()` after changing memory or provider config.
     pub fn embedding_client(&self) -> Option<EmbeddingClient> {
+        if let Some(client) = self.embedding_client_cache.lock().as_ref() {
+            return Some(client.clone());
+        }
+
+        let generation = self.embedding_client_generation.load(Ordering::Acquire);
+        let client = self.build_embedding_client()?;
+        let mut cache = self.embedding_client_cache.lock();
+        if self.embedding_client_generation.load(Ordering::Acquire) == generation {
+            *cache = Some(client.clone());
+        }
+        Some(client)
+    }
+
+    /// Drop the cached EmbeddingClient so the next `embedding_client()` call
+    /// re-reads memory and provider config.
+    pub fn reload_embedding_client(&self) {
+        self.embedding_client_generation
+            .fetch_add(1, Ordering::AcqRel);
+        *self.embedding_client_cache.lock() = None;
+    }
+
+    /// Build an EmbeddingClient from the current memory + provider config.
+    fn build_embedding_client(&self) -> Option<EmbeddingClient> {
         let cfg = self.memory_config.lock();
 
         // For provider-based modes we don't require base_url/model to be set
@@ -208,7 +208,8 @@ impl ToolIndex {
 
     /// Populate the index by embedding all tool definitions.
     /// Called once on startup (or lazily on first request_tools call).
-    /// Uses the existing Ollama embedding client (~50ms per tool, ~4s total).
+    /// All definitions go through one `embed_batch` call, so the whole index
+    /// costs a handful of requests rather than one per tool.
     pub async fn build(&mut self, all_tools: &[ToolDefinition], client: &EmbeddingClient) {
         info!(
             "[tool-index] Building tool index for {} definitions...",
@@ -216,64 +217,35 @@ impl ToolIndex {
         );
         self.tools.clear();
 
+        let texts: Vec<String> = all_tools
+            .iter()
+            .map(|tool| format!("{}: {}", tool.function.name, tool.function.description))
+            .collect();
+        let refs: Vec<&str> = texts.iter().map(String::as_str).collect();
+        let embeddings = client.embed_batch(&refs).await.unwrap_or_else(|e| {
+            warn!(
+                "[tool-index] Embedding unavailable — indexing {} tools without vectors: {}",
+                all_tools.len(),
+                e
+            );
+            vec![None; all_tools.len()]
+        });
+
         let mut success = 0;
         let mut failed = 0;
-        let mut consecutive_failures = 0;
-        let mut embed_disabled = false;
-
-        for tool in all_tools {
-            // Circuit breaker: if we've had 3+ consecutive failures, skip embedding
-            // for the rest (the provider likely doesn't support embeddings at all).
-            if embed_disabled {
-                self.tools.push(IndexedTool {
-                    definition: tool.clone(),
-                    embedding: Vec::new(),
-                    domain: tool_domain(&tool.function.name).to_string(),
-                });
+        for (tool, embedding) in all_tools.iter().zip(embeddings) {
+            // Tools without an embedding can still be found by name or domain
+            let embedding = embedding.unwrap_or_default();
+            if embedding.is_empty() {
                 failed += 1;
-                continue;
-            }
-
-            let text = format!("{}: {}", tool.function.name, tool.function.description);
-            match client.embed(&text).await {
-                Ok(embedding) => {
-                    self.tools.push(IndexedTool {
-                        definition: tool.clone(),
-                        embedding,
-                        domain: tool_domain(&tool.function.name).to_string(),
-                    });
-                    success += 1;
-                    consecutive_failures = 0;
-                }
-                Err(e) => {
-                    let err_str = e.to_string();
-                    if failed == 0 {
-                        // Only log the full error once
-                        warn!(
-                            "[tool-index] Failed to embed tool '{}': {}",
-                            tool.function.name, err_str
-                        );
-                    }
-                    // Still add the tool without embedding — it can be found by name or domain
-                    self.tools.push(IndexedTool {
-                        definition: tool.clone(),
-                        embedding: Vec::new(),
-                        domain: tool_domain(&tool.function.name).to_string(),
-                    });
-                    failed += 1;
-                    consecutive_failures += 1;
-
-                    // After 3 consecutive failures, give up embedding entirely
-                    if consecutive_failures >= 3 {
-                        warn!(
-                            "[tool-index] Embedding unavailable after {} consecutive failures — skipping remaining {} tools",
-                            consecutive_failures,
-                            all_tools.len() - success - failed
-                        );
-                        embed_disabled = true;
-                    }
-                }
+            } else {
+                success += 1;
             }
+            self.tools.push(IndexedTool {
+                definition: tool.clone(),
+                embedding,
+                domain: tool_domain(&tool.function.name).to_string(),
+            });
         }
 
         self.ready = true;
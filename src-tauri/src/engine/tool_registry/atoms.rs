@@ -88,9 +88,6 @@ pub const DEFAULT_TOP_K: usize = 6;
 /// Maximum number of tools to return after domain expansion.
 pub const MAX_RESULTS: usize = 30;
 
-/// How many consecutive embedding failures before circuit-breaking.
-pub const EMBED_CIRCUIT_BREAKER_THRESHOLD: u32 = 3;
-
 // ── BM25 Scoring ──────────────────────────────────────────────────────────
 
 /// BM25 parameters (standard values).
@@ -181,71 +181,53 @@ impl PersistentToolRegistry {
         };
 
         let now = chrono::Utc::now().timestamp();
-        let mut embedded = 0;
-        let mut skipped = 0;
-        let mut failed = 0;
-        let mut consecutive_failures: u32 = 0;
-
-        for tool in tools {
-            let name = &tool.function.name;
+        let fresh: Vec<&ToolDefinition> = tools
+            .iter()
+            .filter(|tool| !cached_names.contains(&tool.function.name))
+            .collect();
+        let skipped = tools.len() - fresh.len();
 
-            // Skip if already cached
-            if cached_names.contains(name) {
-                skipped += 1;
-                continue;
-            }
+        // One batched call for every uncached tool instead of a request each.
+        let texts: Vec<String> = fresh
+            .iter()
+            .map(|tool| format!("{}: {}", tool.function.name, tool.function.description))
+            .collect();
+        let refs: Vec<&str> = texts.iter().map(String::as_str).collect();
+        let embeddings = if refs.is_empty() {
+            Vec::new()
+        } else {
+            client.embed_batch(&refs).await.unwrap_or_else(|e| {
+                warn!(
+                    "[tool-registry] Embedding failed for {} tools: {}",
+                    refs.len(),
+                    e
+                );
+                vec![None; refs.len()]
+            })
+        };
 
-            // Circuit breaker: too many consecutive failures
-            if consecutive_failures >= atoms::EMBED_CIRCUIT_BREAKER_THRESHOLD {
-                // Save without embedding — still searchable by BM25/keyword
+        let mut embedded = 0;
+        let mut failed = 0;
+        {
+            let db = conn.lock();
+            for (tool, embedding) in fresh.into_iter().zip(embeddings) {
+                // Saved even without an embedding — still searchable by BM25/keyword
+                let embedding = embedding.unwrap_or_default();
+                if embedding.is_empty() {
+                    failed += 1;
+                } else {
+                    embedded += 1;
+                }
+                let name = &tool.function.name;
                 let record = ToolEmbeddingRecord {
                     tool_name: name.clone(),
                     description: tool.function.description.clone(),
-                    embedding: Vec::new(),
+                    embedding,
                     domain: tool_domain(name).to_string(),
                     source: classify_tool_source(name),
                     updated_at: now,
                 };
-                let db = conn.lock();
                 Self::save_embedding(&db, &record).ok();
-                failed += 1;
-                continue;
-            }
-
-            let text = format!("{}: {}", name, tool.function.description);
-            match client.embed(&text).await {
-                Ok(embedding) => {
-                    let record = ToolEmbeddingRecord {
-                        tool_name: name.clone(),
-                        description: tool.function.description.clone(),
-                        embedding,
-                        domain: tool_domain(name).to_string(),
-                        source: classify_tool_source(name),
-                        updated_at: now,
-                    };
-                    let db = conn.lock();
-                    Self::save_embedding(&db, &record).ok();
-                    embedded += 1;
-                    consecutive_failures = 0;
-                }
-                Err(e) => {
-                    if failed == 0 {
-                        warn!("[tool-registry] Embedding failed for '{}': {}", name, e);
-                    }
-                    // Save without embedding
-                    let record = ToolEmbeddingRecord {
-                        tool_name: name.clone(),
-                        description: tool.function.description.clone(),
-                        embedding: Vec::new(),
-                        domain: tool_domain(name).to_string(),
-                        source: classify_tool_source(name),
-                        updated_at: now,
-                    };
-                    let db = conn.lock();
-                    Self::save_embedding(&db, &record).ok();
-                    failed += 1;
-                    consecutive_failures += 1;
-                }
             }
         }
 
@@ -343,6 +343,7 @@ pub fn run() {
             commands::memory::engine_embedding_pull_model,
             commands::memory::engine_ensure_embedding_ready,
             commands::memory::engine_memory_backfill,
+            commands::memory::engine_embedding_cache_clear,
             commands::memory::engine_working_memory_save,
             commands::memory::engine_working_memory_restore,
             commands::memory::engine_memory_purge_user,
@@ -206,6 +206,10 @@ export interface EngineMemoryConfig {
   auto_capture: boolean;
   recall_limit: number;
   recall_threshold: number;
+  embedding_cache_capacity?: number;
+  semantic_cache_threshold?: number | null;
+  embedding_max_concurrency?: number;
+  embedding_disk_cache_capacity?: number;
 }
 
 export interface EngineMemoryStats {
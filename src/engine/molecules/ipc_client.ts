@@ -345,6 +345,10 @@ export class PawEngineClient {
     return invoke('engine_memory_backfill');
   }
 
+  async embeddingCacheClear(): Promise<void> {
+    return invoke('engine_embedding_cache_clear');
+  }
+
   async memoryEmbeddingProjection(limit?: number): Promise<EmbeddingProjection> {
     return invoke<EmbeddingProjection>('engine_memory_embedding_projection', { limit });
   }
@@ -343,10 +343,15 @@ export async function loadAgentDefaultsSettings() {
     backfillBtn.className = 'btn btn-sm';
     backfillBtn.textContent = 'Backfill Embeddings';
     backfillBtn.title = 'Embed any memories that were stored without vectors';
+    const clearCacheBtn = document.createElement('button');
+    clearCacheBtn.className = 'btn btn-sm';
+    clearCacheBtn.textContent = 'Clear Embedding Cache';
+    clearCacheBtn.title = 'Delete cached embedding vectors, in memory and on disk';
     const statusSpan = document.createElement('span');
     statusSpan.style.cssText = 'font-size:12px;color:var(--text-muted)';
     embStatusRow.appendChild(testBtn);
     embStatusRow.appendChild(backfillBtn);
+    embStatusRow.appendChild(clearCacheBtn);
     embStatusRow.appendChild(statusSpan);
     embSection.appendChild(embStatusRow);
 
@@ -393,6 +398,20 @@ export async function loadAgentDefaultsSettings() {
       }
     });
 
+    clearCacheBtn.addEventListener('click', async () => {
+      clearCacheBtn.disabled = true;
+      try {
+        await pawEngine.embeddingCacheClear();
+        statusSpan.textContent = '✓ Embedding cache cleared';
+        statusSpan.style.color = 'var(--text-success)';
+      } catch (e) {
+        statusSpan.textContent = `✗ Clear failed: ${e instanceof Error ? e.message : e}`;
+        statusSpan.style.color = 'var(--text-danger)';
+      } finally {
+        clearCacheBtn.disabled = false;
+      }
+    });
+
     // ── Provider-dependent visibility ──────────────────────────────────
     const updateEmbProviderUI = () => {
       const prov = embProviderSel.value;